@@ -15,12 +15,11 @@ Designer de Campos — Fluxos [v3.0] - INTEGRADO COM IMPORTADOR BPMN
 
 from __future__ import annotations
 import os, re, uuid, json, datetime, sys, traceback, tkinter as tk, unicodedata, importlib
-# Imports adicionados para o importador de BPMN
-import io
-import zipfile
-import xml.etree.ElementTree as ET
-from collections import defaultdict
-from dataclasses import dataclass, field as dc_field
+import functools
+import operator
+# io/zipfile/xml do importador de BPMN são importados sob demanda (ver _xml_backend)
+from collections import defaultdict, deque
+from dataclasses import dataclass, field as dc_field, fields as dc_fields
 from typing import Dict, List, Optional, Tuple, Set, Any, Callable
 from tkinter import filedialog, messagebox, ttk
 import customtkinter as ctk
@@ -55,6 +54,46 @@ except ImportError:
     ctypes = None
     wintypes = None
 
+# JSON rápido (opcional): orjson quando disponível, json da stdlib como fallback
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_dumps_bytes(data: Any) -> bytes:
+    """Serializa em UTF-8 com indentação de 2 espaços e sem escapar acentos."""
+    if _orjson is not None:
+        return _orjson.dumps(data, option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _json_dumps(data: Any) -> str:
+    return _json_dumps_bytes(data).decode("utf-8")
+
+
+def _json_loads(raw: Any) -> Any:
+    """Desserializa texto/bytes JSON (orjson.JSONDecodeError herda de json.JSONDecodeError)."""
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw)
+
+def _atomic_write_bytes(path: str, payload: bytes) -> None:
+    """Grava num .tmp ao lado do destino e troca com os.replace: uma falha nunca deixa o arquivo pela metade."""
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb", buffering=1 << 20) as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
 # Visão HTML
 try:
     from tkinterweb import HtmlFrame
@@ -138,17 +177,26 @@ class ThemeCatalog:
                 border_width=0,
             ),
         }
+        # Paleta e variantes são imutáveis: resolve tudo uma vez
+        self._colors: Dict[str, str] = {f.name: getattr(self.palette, f.name) for f in dc_fields(self.palette)}
+        self._variant_opts: Dict[str, Dict[str, Any]] = {
+            name: {k: v for k, v in config.__dict__.items() if v is not None}
+            for name, config in self.button_variants.items()
+        }
 
     def color(self, key: str) -> str:
-        return getattr(self.palette, key)
+        return self._colors[key]
 
     def apply_button(self, widget: ctk.CTkButton, variant: str) -> None:
-        config = self.button_variants.get(variant)
-        if not config:
-            return
-        options = {k: v for k, v in config.__dict__.items() if v is not None}
+        options = self._variant_opts.get(variant)
         if not options:
             return
+        try:
+            widget.configure(**options)
+            return
+        except (tk.TclError, AttributeError, TypeError, ValueError):
+            pass
+        # Alguma opção não é suportada pelo widget: aplica chave a chave
         for key, value in options.items():
             try:
                 widget.configure(**{key: value})
@@ -161,6 +209,13 @@ THEME = ThemeCatalog()
 
 def _safe_configure(widget: tk.Misc, **kwargs) -> None:
     """Aplica opções a widgets CustomTkinter ignorando chaves desconhecidas."""
+    if not kwargs:
+        return
+    try:
+        widget.configure(**kwargs)
+        return
+    except (tk.TclError, AttributeError, TypeError, ValueError):
+        pass
     for key, value in kwargs.items():
         try:
             widget.configure(**{key: value})
@@ -209,13 +264,76 @@ def strip_ns(tag: str) -> str:
 def normalize_label(s: str) -> str:
     """Limpa e normaliza os nomes/rótulos extraídos do XML."""
     if not s: return ""
-    return " ".join(s.replace("\r", " ").replace("\n", " ").split())
+    # Caminho rápido: rótulo ASCII já limpo (sem controlos, espaços duplos ou nas pontas)
+    if s.isascii() and s.isprintable() and "  " not in s and s[0] != " " and s[-1] != " ":
+        return s
+    return " ".join(s.split())
+
+@functools.lru_cache(maxsize=8)
+def _xpdl_tags(ns_uri: str) -> Tuple[str, str, str, str, str]:
+    """Tags em notação Clark ({uri}Local) para Pool, Activity, Transition, Route e Implementation."""
+    return tuple(sys.intern(f"{{{ns_uri}}}{local}") for local in ("Pool", "Activity", "Transition", "Route", "Implementation"))
+
+@functools.lru_cache(maxsize=1)
+def _xml_backend() -> Tuple[Any, bool]:
+    """Importa o parser XML só quando o importador de BPMN é usado: lxml (opcional) ou stdlib."""
+    try:
+        # lxml acelera bastante o iterparse do importador de BPMN
+        from lxml import etree
+        return etree, True
+    except ImportError:
+        import xml.etree.ElementTree as ET
+        return ET, False
+
+def _scan_xpdl_stream(stream) -> Tuple[List[str], Dict[str, dict], List[dict]]:
+    """
+    Lê o Diagram.xml em streaming (iterparse) e devolve (nomes de pool, nós, transições).
+    Cada elemento de interesse é limpo logo após ser consumido, para que o DOM completo
+    nunca fique residente em memória.
+    """
+    pool_names: List[str] = []
+    nodes: Dict[str, dict] = {}
+    transitions: List[dict] = []
+    q_pool = q_act = q_tr = q_route = q_impl = None
+    _XML, is_lxml = _xml_backend()
+    for event, el in _XML.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if q_pool is None:
+                # O namespace do elemento raiz define as tags de interesse
+                q_pool, q_act, q_tr, q_route, q_impl = _xpdl_tags(el.tag.split('}')[0].strip('{'))
+            continue
+        tag = el.tag
+        if tag == q_act:
+            aid = el.get('Id', '')
+            has_route = has_impl = False
+            for child in el:
+                if child.tag == q_route: has_route = True
+                elif child.tag == q_impl: has_impl = True
+            typ = 'Route' if has_route else ('Task' if has_impl else 'Activity')
+            nodes[aid] = {"id": aid, "name": normalize_label(el.get('Name', '') or ''), "type": typ, "has_implementation": has_impl}
+        elif tag == q_tr:
+            transitions.append({
+                "from": el.get('From', ''), "to": el.get('To', ''),
+                "name": normalize_label(el.get('Name', ''))
+            })
+        elif tag == q_pool:
+            pool_names.append(normalize_label(el.get("Name", "") or ""))
+        else:
+            continue
+        el.clear()
+        if is_lxml:
+            # Idioma do lxml: descarta também os irmãos anteriores já processados
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+    return pool_names, nodes, transitions
 
 def parse_bizagi_group_by_diagram(bpm_path: str):
     """
     Processa um ficheiro .bpm e extrai todos os nós, transições e nomes de diagrama,
     usando a lógica de Pool para identificar o nome do diagrama.
     """
+    import io, shutil, tempfile, zipfile
+
     nodes_by_diag = {}
     transitions_by_diag = {}
     diagrams_labels = []
@@ -226,21 +344,22 @@ def parse_bizagi_group_by_diagram(bpm_path: str):
             raise RuntimeError("Nenhum .diag encontrado dentro do .bpm")
         for d in diags:
             try:
-                bio = io.BytesIO(z.read(d))
-                if not zipfile.is_zipfile(bio): continue
-                with zipfile.ZipFile(bio) as inner:
-                    if "Diagram.xml" not in inner.namelist(): continue
-                    root = ET.fromstring(inner.read("Diagram.xml"))
+                # O .diag é um zip aninhado: copia em streaming para um spool (RAM até 4 MB,
+                # disco acima disso), pois o ZipFile interno precisa de seek barato.
+                with z.open(d, 'r') as raw, tempfile.SpooledTemporaryFile(max_size=4 << 20) as spooled:
+                    shutil.copyfileobj(io.BufferedReader(raw, buffer_size=1 << 20), spooled, 1 << 20)
+                    spooled.seek(0)
+                    if not zipfile.is_zipfile(spooled): continue
+                    spooled.seek(0)
+                    with zipfile.ZipFile(spooled) as inner:
+                        if "Diagram.xml" not in inner.namelist(): continue
+                        with inner.open("Diagram.xml") as xf:
+                            # Buffer grande: o inflate trabalha em blocos de 1 MB em vez das leituras curtas do expat
+                            pool_names, nodes, transitions = _scan_xpdl_stream(io.BufferedReader(xf, buffer_size=1 << 20))
             except Exception:
                 diagrams_labels.append((d, d)) # Fallback em caso de erro de leitura
                 continue
 
-            ns = {'xpdl': root.tag.split('}')[0].strip('{')}
-            
-            pool_names = [
-                normalize_label(p.get("Name", "") or "")
-                for p in root.findall(".//xpdl:Pool", ns)
-            ]
             label = d 
             if pool_names:
                 preferred = [p for p in pool_names if p and p.lower() != "processo principal"]
@@ -248,38 +367,45 @@ def parse_bizagi_group_by_diagram(bpm_path: str):
 
             diagrams_labels.append((d, label))
 
-            nodes = {}
-            transitions = []
-            for act in root.findall('.//xpdl:Activity', ns):
-                aid = act.get('Id', '')
-                name = normalize_label(act.get('Name', '') or '')
-                route = act.find('xpdl:Route', ns)
-                implementation = act.find('xpdl:Implementation', ns)
-                typ = 'Route' if route is not None else ('Task' if implementation is not None else 'Activity')
-                nodes[aid] = {"id": aid, "name": name, "type": typ, "has_implementation": implementation is not None}
-
-            for tr in root.findall('.//xpdl:Transition', ns):
-                transitions.append({
-                    "from": tr.get('From', ''), "to": tr.get('To', ''),
-                    "name": normalize_label(tr.get('Name', ''))
-                })
             nodes_by_diag[d] = nodes
             transitions_by_diag[d] = transitions
 
-    diagrams_labels.sort(key=lambda x: x[1])
+    diagrams_labels.sort(key=lambda x: x[1].casefold())
     return diagrams_labels, nodes_by_diag, transitions_by_diag
 
+@functools.lru_cache(maxsize=8)
+def _parse_bizagi_cached(bpm_path: str, mtime_ns: int, size: int):
+    # mtime/tamanho fazem parte da chave: editar o .bpm invalida a entrada
+    return parse_bizagi_group_by_diagram(bpm_path)
+
+def parse_bizagi_group_by_diagram_cached(bpm_path: str):
+    """
+    Versão com cache de parse_bizagi_group_by_diagram por (caminho, mtime, tamanho).
+    Os nós são copiados porque o importador edita nomes de tarefas no próprio dict.
+    """
+    st = os.stat(bpm_path)
+    diags, nodes, trans = _parse_bizagi_cached(os.path.abspath(bpm_path), st.st_mtime_ns, st.st_size)
+    nodes_copy = {d: {aid: dict(n) for aid, n in by_id.items()} for d, by_id in nodes.items()}
+    return list(diags), nodes_copy, trans
+
+_SIM_NAO_OPTIONS = (frozenset({"sim", "não"}), frozenset({"sim", "nao"}))
+
 def build_task_fields_for_diagram(nodes, transitions):
     """Filtra tarefas e extrai campos dos gateways."""
-    out_by, in_by = {}, {}
+    out_by, in_by = defaultdict(list), defaultdict(list)
     for t in transitions:
-        out_by.setdefault(t["from"], []).append(t)
-        in_by.setdefault(t["to"], []).append(t)
-
-    tasks = [n for n in nodes.values() if n["type"] == "Task" and n.get("has_implementation")]
+        out_by[t["from"]].append(t)
+        in_by[t["to"]].append(t)
+
+    tasks, gateways = [], []
+    for n in nodes.values():
+        if n["type"] == "Task":
+            if n.get("has_implementation"): tasks.append(n)
+        elif n["type"] == "Route":
+            gateways.append(n)
     task_fields = {t["id"]: [] for t in tasks}
 
-    for gw in [n for n in nodes.values() if n["type"] == "Route"]:
+    for gw in gateways:
         incoming, outgoing = in_by.get(gw["id"], []), out_by.get(gw["id"], [])
         opts = [t["name"] for t in outgoing if t.get("name")]
         if not opts and outgoing:
@@ -289,7 +415,7 @@ def build_task_fields_for_diagram(nodes, transitions):
             opts = ["Sim", "Não"]
         
         tipo = "Lista"
-        if set(o.lower() for o in opts) in [{"sim", "não"}, {"sim", "nao"}]:
+        if len(opts) == 2 and frozenset(o.lower() for o in opts) in _SIM_NAO_OPTIONS:
             tipo = "Lista (Sim/Não)"
         
         campo_nome = normalize_label(gw.get("name", ""))
@@ -305,13 +431,48 @@ def build_task_fields_for_diagram(nodes, transitions):
 def _uid() -> str:
     return uuid.uuid4().hex[:8]
 
+_UTC = datetime.timezone.utc
+
 def _now_iso() -> str:
     try:
-        return datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        return datetime.datetime.now(_UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
     except Exception:
         return ""
 
+def _known_desktop_dir() -> Optional[str]:
+    """Área de trabalho real do usuário no Windows (SHGetKnownFolderPath), com redirecionamentos e nome localizado."""
+    if sys.platform != "win32" or ctypes is None or wintypes is None:
+        return None
+
+    class GUID(ctypes.Structure):
+        _fields_ = [
+            ("Data1", wintypes.DWORD),
+            ("Data2", wintypes.WORD),
+            ("Data3", wintypes.WORD),
+            ("Data4", ctypes.c_ubyte * 8),
+        ]
+
+    # FOLDERID_Desktop = {B4BFCC3A-DB2C-424C-B029-7FE99A87C641}
+    folder_id = GUID(0xB4BFCC3A, 0xDB2C, 0x424C, (ctypes.c_ubyte * 8)(0xB0, 0x29, 0x7F, 0xE9, 0x9A, 0x87, 0xC6, 0x41))
+    buf = ctypes.c_wchar_p()
+    try:
+        if ctypes.windll.shell32.SHGetKnownFolderPath(ctypes.byref(folder_id), 0, None, ctypes.byref(buf)) != 0:
+            return None
+        return buf.value or None
+    except Exception:
+        return None
+    finally:
+        try:
+            if buf.value is not None:
+                ctypes.windll.ole32.CoTaskMemFree(buf)
+        except Exception:
+            pass
+
+@functools.lru_cache(maxsize=1)
 def _best_desktop_dir() -> str:
+    known = _known_desktop_dir()
+    if known and os.path.isdir(known):
+        return known
     home = os.path.expanduser("~")
     for path in [
         os.path.join(home, "Desktop"),
@@ -343,6 +504,11 @@ def _apply_secondary_style(btn: ctk.CTkButton) -> None:
     except Exception:
         pass
 
+def _ctk_event_targets(widget) -> List[Any]:
+    """Widgets Tk que recebem os eventos de um widget CTk (o mesmo que CTkFrame/CTkLabel.bind usam)."""
+    targets = [w for w in (getattr(widget, "_canvas", None), getattr(widget, "_label", None)) if w is not None]
+    return targets or [widget]
+
 
 def _animate_fade_in(win: tk.Misc, *, duration: int = 140, steps: int = 6) -> None:
     # Versão otimizada: remove o loop de animação que bloqueia a thread
@@ -355,6 +521,9 @@ def _animate_fade_in(win: tk.Misc, *, duration: int = 140, steps: int = 6) -> No
 _APP_ROOT: Optional["App"] = None
 _MSGBOX_FALLBACK_ROOT: Optional[ctk.CTk] = None
 
+# Funções WinAPI resolvidas uma única vez (com argtypes/restype) no carregamento do módulo
+_MonitorFromWindow = _MonitorFromPoint = _GetMonitorInfoW = _GetParent = _DwmSetWindowAttribute = None
+
 if sys.platform == "win32" and ctypes is not None and wintypes is not None:
 
     class MONITORINFO(ctypes.Structure):
@@ -365,25 +534,79 @@ if sys.platform == "win32" and ctypes is not None and wintypes is not None:
             ("dwFlags", wintypes.DWORD),
         ]
 
+    try:
+        # Instância própria de WinDLL: configurar argtypes não afeta outros usuários de ctypes.windll
+        _user32 = ctypes.WinDLL("user32")
+        _MonitorFromWindow = _user32.MonitorFromWindow
+        _MonitorFromWindow.argtypes = [wintypes.HWND, wintypes.DWORD]
+        _MonitorFromWindow.restype = wintypes.HANDLE
+        _MonitorFromPoint = _user32.MonitorFromPoint
+        _MonitorFromPoint.argtypes = [wintypes.POINT, wintypes.DWORD]
+        _MonitorFromPoint.restype = wintypes.HANDLE
+        _GetMonitorInfoW = _user32.GetMonitorInfoW
+        _GetMonitorInfoW.argtypes = [wintypes.HANDLE, ctypes.POINTER(MONITORINFO)]
+        _GetMonitorInfoW.restype = wintypes.BOOL
+        _GetParent = _user32.GetParent
+        _GetParent.argtypes = [wintypes.HWND]
+        _GetParent.restype = wintypes.HWND
+    except Exception:
+        _MonitorFromWindow = _MonitorFromPoint = _GetMonitorInfoW = _GetParent = None
+    try:
+        _DwmSetWindowAttribute = ctypes.WinDLL("dwmapi").DwmSetWindowAttribute
+        _DwmSetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+        _DwmSetWindowAttribute.restype = ctypes.c_long
+    except Exception:
+        _DwmSetWindowAttribute = None
+
+
+# Limites do monitor por HWND: (geração, limites). A geração avança quando qualquer
+# toplevel observada (janela principal ou diálogo) é movida/redimensionada.
+_MONITOR_CACHE: Dict[int, Tuple[int, Tuple[int, int, int, int]]] = {}
+_MONITOR_CACHE_GEN = 0
+_MONITOR_WATCH_TAG = "MonitorWatch"
+
+
+def _invalidate_monitor_cache(event=None) -> None:
+    global _MONITOR_CACHE_GEN
+    _MONITOR_CACHE_GEN += 1
+    _MONITOR_CACHE.clear()
+
+
+def _watch_monitor_changes(top: tk.Misc) -> None:
+    # Bindtag própria na toplevel: o <Configure> dos filhos não passa por ela
+    tags = top.bindtags()
+    if _MONITOR_WATCH_TAG not in tags:
+        top.bindtags((_MONITOR_WATCH_TAG,) + tags)
+        top.bind_class(_MONITOR_WATCH_TAG, "<Configure>", _invalidate_monitor_cache)
+
 
 def _get_monitor_bounds_for_window(win: tk.Misc) -> Tuple[int, int, int, int]:
-    if sys.platform == "win32" and ctypes is not None and wintypes is not None:
+    if _MonitorFromWindow is not None and _GetMonitorInfoW is not None:
         hwnd = None
         try:
             hwnd = int(win.winfo_id())
         except Exception:
             pass
         if hwnd:
+            cached = _MONITOR_CACHE.get(hwnd)
+            if cached is not None and cached[0] == _MONITOR_CACHE_GEN:
+                return cached[1]
             try:
-                monitor = ctypes.windll.user32.MonitorFromWindow(hwnd, 2)
+                monitor = _MonitorFromWindow(hwnd, 2)
             except Exception:
                 monitor = None
             if monitor:
                 info = MONITORINFO()
                 info.cbSize = ctypes.sizeof(MONITORINFO)
-                if ctypes.windll.user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+                if _GetMonitorInfoW(monitor, ctypes.byref(info)):
                     rect = info.rcWork
-                    return rect.left, rect.top, rect.right, rect.bottom
+                    bounds = (rect.left, rect.top, rect.right, rect.bottom)
+                    try:
+                        _watch_monitor_changes(win.winfo_toplevel())
+                    except Exception:
+                        return bounds
+                    _MONITOR_CACHE[hwnd] = (_MONITOR_CACHE_GEN, bounds)
+                    return bounds
 
     try:
         screen_w = win.winfo_screenwidth()
@@ -394,16 +617,16 @@ def _get_monitor_bounds_for_window(win: tk.Misc) -> Tuple[int, int, int, int]:
 
 
 def _get_monitor_bounds_for_point(x: int, y: int, fallback: tk.Misc) -> Tuple[int, int, int, int]:
-    if sys.platform == "win32" and ctypes is not None and wintypes is not None:
+    if _MonitorFromPoint is not None and _GetMonitorInfoW is not None:
         try:
             point = wintypes.POINT(x, y)
-            monitor = ctypes.windll.user32.MonitorFromPoint(point, 2)
+            monitor = _MonitorFromPoint(point, 2)
         except Exception:
             monitor = None
         if monitor:
             info = MONITORINFO()
             info.cbSize = ctypes.sizeof(MONITORINFO)
-            if ctypes.windll.user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+            if _GetMonitorInfoW(monitor, ctypes.byref(info)):
                 rect = info.rcWork
                 return rect.left, rect.top, rect.right, rect.bottom
 
@@ -419,6 +642,10 @@ def _clamp_to_bounds(x: int, y: int, width: int, height: int, bounds: Tuple[int,
     return clamped_x, clamped_y
 
 
+# Geometria Tk no formato "LxA+X+Y"
+_GEOMETRY_RE = re.compile(r"^(\d+)x(\d+)([+-]\d+)([+-]\d+)$")
+
+
 def _center_within(master: Optional[tk.Misc], width: int, height: int) -> Optional[Tuple[int, int]]:
     """Calcula a posição central relativa a uma janela mestre.
 
@@ -488,7 +715,7 @@ def _center_within(master: Optional[tk.Misc], width: int, height: int) -> Option
 
         if geometry:
             try:
-                match = re.match(r"^(\d+)x(\d+)([+-]\d+)([+-]\d+)$", geometry)
+                match = _GEOMETRY_RE.match(geometry)
                 if match:
                     geom_w = int(match.group(1))
                     geom_h = int(match.group(2))
@@ -536,14 +763,14 @@ _ICON_SYMBOLS = {
 
 
 def _apply_dark_title_bar(win: tk.Misc) -> None:
-    if sys.platform != "win32" or ctypes is None:
+    if _GetParent is None or _DwmSetWindowAttribute is None:
         return
     try:
         win.update_idletasks()
-        hwnd = ctypes.windll.user32.GetParent(win.winfo_id())
+        hwnd = _GetParent(win.winfo_id())
         DWMWA_USE_IMMERSIVE_DARK_MODE = 20
         value = ctypes.c_int(1)
-        ctypes.windll.dwmapi.DwmSetWindowAttribute(
+        _DwmSetWindowAttribute(
             hwnd,
             DWMWA_USE_IMMERSIVE_DARK_MODE,
             ctypes.byref(value),
@@ -578,6 +805,18 @@ def _resolve_master(parent: Optional[tk.Misc]) -> tk.Misc:
     return _MSGBOX_FALLBACK_ROOT
 
 
+_FONT_CACHE: Dict[Tuple[Any, ...], ctk.CTkFont] = {}
+
+
+def _font(**kwargs) -> ctk.CTkFont:
+    """CTkFont compartilhada por combinação de opções (e por raiz Tk, pois fontes são por intérprete)."""
+    key = (id(getattr(tk, "_default_root", None)),) + tuple(sorted(kwargs.items()))
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        font = _FONT_CACHE[key] = ctk.CTkFont(**kwargs)
+    return font
+
+
 def _show_messagebox(
     title: str,
     message: str,
@@ -599,10 +838,11 @@ def _show_messagebox(
     except Exception:
         pass
 
-    message_font = ctk.CTkFont(size=14)
+    message_font = _font(size=14)
     raw_lines = message.splitlines() if message else [""]
-    measured = [message_font.measure(line) for line in raw_lines if line]
-    longest_line = max(measured) if measured else message_font.measure(message or "")
+    longest_line = max((message_font.measure(line) for line in raw_lines if line), default=None)
+    if longest_line is None:
+        longest_line = message_font.measure(message or "")
     wrap_length = min(560, max(320, longest_line + 40))
 
     container = ctk.CTkFrame(dialog, fg_color="transparent")
@@ -615,7 +855,7 @@ def _show_messagebox(
     ctk.CTkLabel(
         icon_frame,
         text=symbol,
-        font=ctk.CTkFont(size=28),
+        font=_font(size=28),
         width=54,
         anchor="center",
     ).pack(side="left", padx=(18, 12), pady=18)
@@ -739,13 +979,13 @@ def _patch_messageboxes() -> None:
 _patch_messageboxes()
 
 # ===== Modelo de dados =====
-@dataclass
+@dataclass(slots=True)
 class Condition:
     src_field: str
     op: str
     value: str
 
-@dataclass
+@dataclass(slots=True)
 class ObjectFieldDef:
     name: str
     ftype: str = "Texto"
@@ -756,7 +996,7 @@ class ObjectFieldDef:
     order: int = 0
     note: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Field:
     id: str
     name: str = "Novo campo"
@@ -775,39 +1015,60 @@ class Field:
     obj_type: str = ""
     cond: List[Condition] = dc_field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     id: str
     name: str
     fields: List[Field] = dc_field(default_factory=list)
 
-@dataclass
+def _clone_cond(c: Condition, src_field: Optional[str] = None) -> Condition:
+    """Cópia de uma condição (só strings: não precisa de deepcopy); `src_field` troca o campo de origem."""
+    return Condition(c.src_field if src_field is None else src_field, c.op, c.value)
+
+def _field_to_dict(f: Field) -> dict:
+    return {
+        "id": f.id, "name": f.name, "ftype": f.ftype,
+        "required": f.required, "readonly": f.readonly,
+        "info": f.info, "options": f.options, "note": f.note,
+        "origin_task": f.origin_task, "origin_field": f.origin_field,
+        "name_locked": f.name_locked, "name_lock_reason": f.name_lock_reason,
+        "name_before_obj": f.name_before_obj, "name_before_origin": f.name_before_origin,
+        "obj_type": f.obj_type,
+        "cond": [{"src_field": c.src_field, "op": c.op, "value": c.value} for c in f.cond],
+    }
+
+# Tudo o que _field_to_dict serializa além do id e das condições (usado para comparar estados no undo)
+_field_state = operator.attrgetter(
+    "name", "ftype", "required", "readonly", "info", "options", "note",
+    "origin_task", "origin_field", "name_locked", "name_lock_reason",
+    "name_before_obj", "name_before_origin", "obj_type",
+)
+
+@dataclass(slots=True)
 class ProjectModel:
     flow_name: str = "Novo fluxo"
     tasks: List[Task] = dc_field(default_factory=list)
     object_type: str = ""
     object_schema: List[ObjectFieldDef] = dc_field(default_factory=list)
 
+    def object_schema_dicts(self) -> List[dict]:
+        return [
+            {
+                "name": o.name, "ftype": o.ftype, "options": o.options,
+                "required": o.required, "readonly": o.readonly,
+                "group": o.group, "order": o.order, "note": o.note,
+            } for o in self.object_schema
+        ]
+
     def to_dict(self) -> dict:
         return {
             "flow_name": self.flow_name,
             "object_type": self.object_type,
-            "object_schema": [vars(ofd) for ofd in self.object_schema],
+            "object_schema": self.object_schema_dicts(),
             "tasks": [
                 {
                     "id": t.id, "name": t.name,
-                    "fields": [
-                        {
-                            "id": f.id, "name": f.name, "ftype": f.ftype,
-                            "required": f.required, "readonly": f.readonly,
-                            "info": f.info, "options": f.options, "note": f.note,
-                            "origin_task": f.origin_task, "origin_field": f.origin_field,
-                            "name_locked": f.name_locked, "name_lock_reason": f.name_lock_reason,
-                            "name_before_obj": f.name_before_obj, "name_before_origin": f.name_before_origin,
-                            "obj_type": f.obj_type,
-                            "cond": [{"src_field": c.src_field, "op": c.op, "value": c.value} for c in f.cond],
-                        } for f in t.fields
-                    ],
+                    "fields": [_field_to_dict(f) for f in t.fields],
                 } for t in self.tasks
             ]
         }
@@ -825,60 +1086,103 @@ class ProjectModel:
         tasks: List[Task] = []
         for td in d.get("tasks", []):
             fields: List[Field] = []
+            append = fields.append
             for fd in td.get("fields", []):
-                fields.append(Field(
-                    id=fd.get("id", _uid()),
-                    name=fd.get("name", "Campo"),
-                    ftype=fd.get("ftype", "Texto"),
-                    required=bool(fd.get("required", False)),
-                    readonly=bool(fd.get("readonly", False)),
-                    info=fd.get("info", ""),
-                    options=fd.get("options", ""),
-                    note=fd.get("note", ""),
-                    origin_task=fd.get("origin_task"),
-                    origin_field=fd.get("origin_field"),
-                    name_locked=bool(fd.get("name_locked", False)),
-                    name_lock_reason=fd.get("name_lock_reason", ""),
-                    name_before_obj=fd.get("name_before_obj", ""),
-                    name_before_origin=fd.get("name_before_origin", ""),
-                    obj_type=fd.get("obj_type", ""),
-                    cond=[Condition(**c) for c in fd.get("cond", [])],
+                get = fd.get
+                # _uid() só é gerado quando o id realmente falta
+                append(Field(
+                    fd["id"] if "id" in fd else _uid(),
+                    get("name", "Campo"),
+                    get("ftype", "Texto"),
+                    bool(get("required", False)),
+                    bool(get("readonly", False)),
+                    get("info", ""),
+                    get("options", ""),
+                    get("note", ""),
+                    get("origin_task"),
+                    get("origin_field"),
+                    bool(get("name_locked", False)),
+                    get("name_lock_reason", ""),
+                    get("name_before_obj", ""),
+                    get("name_before_origin", ""),
+                    get("obj_type", ""),
+                    [Condition(c["src_field"], c["op"], c["value"]) for c in get("cond", ())],
                 ))
-            tasks.append(Task(id=td.get("id", _uid()), name=td.get("name", "Tarefa"), fields=fields))
+            tasks.append(Task(td["id"] if "id" in td else _uid(), td.get("name", "Tarefa"), fields))
         return ProjectModel(flow_name=flow_name, tasks=tasks, object_type=object_type, object_schema=object_schema)
 
 # ===== Templates locais =====
 class TemplateStore:
     def __init__(self, path: str = TEMPLATES_DB_PATH):
         self.path = path
+        # Conteúdo já parseado + assinatura (mtime_ns, tamanho) do arquivo de onde veio
+        self._cache: Optional[dict] = None
+        self._cache_sig: Optional[Tuple[int, int]] = None
+        # Índices do conteúdo em cache (o primeiro template com cada id/nome, como nas buscas lineares)
+        self._by_id: Dict[str, dict] = {}
+        self._by_name: Dict[str, dict] = {}
+        self._sorted: Optional[List[dict]] = None  # ordenação por updated_at (desc), refeita só quando o conteúdo muda
         self._ensure_file()
 
     def _ensure_file(self):
         if not os.path.exists(self.path):
             self._write({"templates": []})
 
+    def _file_sig(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _reindex(self, data: dict) -> None:
+        by_id: Dict[str, dict] = {}
+        by_name: Dict[str, dict] = {}
+        for t in data.get("templates", []):
+            by_id.setdefault(t.get("id"), t)
+            by_name.setdefault(t.get("name", ""), t)
+        self._by_id, self._by_name = by_id, by_name
+        self._sorted = None
+
     def _read(self) -> dict:
+        """Devolve o dict em cache enquanto o arquivo não mudar (os métodos que o alteram sempre chamam _write)."""
+        sig = self._file_sig()
+        if sig is not None and self._cache is not None and sig == self._cache_sig:
+            return self._cache
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            # Bytes direto para o parser: evita decodificar para str antes
+            with open(self.path, "rb") as f:
+                data = _json_loads(f.read())
         except Exception:
+            self._cache = self._cache_sig = None
+            self._by_id, self._by_name = {}, {}
             return {"templates": []}
+        self._cache, self._cache_sig = data, sig
+        self._reindex(data)
+        return data
 
     def _write(self, data: dict):
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        try:
+            _atomic_write_bytes(self.path, _json_dumps_bytes(data))
+        except Exception:
+            self._cache = self._cache_sig = None
+            raise
+        self._cache, self._cache_sig = data, self._file_sig()
+        self._reindex(data)
 
     def list_all(self) -> List[dict]:
         data = self._read()
-        items = data.get("templates", [])
-        items.sort(key=lambda x: x.get("updated_at",""), reverse=True)
-        return items
+        if data is not self._cache:
+            return sorted(data.get("templates", []), key=lambda x: x.get("updated_at",""), reverse=True)
+        if self._sorted is None:
+            self._sorted = sorted(data.get("templates", []), key=lambda x: x.get("updated_at",""), reverse=True)
+        return list(self._sorted)
 
     def save_template(self, name: str, project: ProjectModel, replace: bool = False, create_copy_if_exists: bool = False) -> dict:
         data = self._read()
         items = data.get("templates", [])
         now = _now_iso()
-        existing = next((t for t in items if t.get("name","") == name), None)
+        existing = self._by_name.get(name)
         if existing and replace:
             existing["project"] = project.to_dict()
             existing["updated_at"] = now
@@ -888,7 +1192,7 @@ class TemplateStore:
             n = 2
             base = name
             new_name = f"{base} ({n})"
-            while any(t.get("name","") == new_name for t in items):
+            while new_name in self._by_name:
                 n += 1
                 new_name = f"{base} ({n})"
             name = new_name
@@ -899,32 +1203,32 @@ class TemplateStore:
         return entry
 
     def rename(self, tmpl_id: str, new_name: str) -> bool:
-        data = self._read(); items = data.get("templates", [])
-        if any(t.get("name","") == new_name and t.get("id") != tmpl_id for t in items):
+        data = self._read()
+        other = self._by_name.get(new_name)
+        if other is not None and other.get("id") != tmpl_id:
             return False
-        for t in items:
-            if t.get("id") == tmpl_id:
-                t["name"] = new_name
-                t["updated_at"] = _now_iso()
-                self._write(data)
-                return True
-        return False
+        t = self._by_id.get(tmpl_id)
+        if t is None:
+            return False
+        t["name"] = new_name
+        t["updated_at"] = _now_iso()
+        self._write(data)
+        return True
 
     def delete(self, tmpl_id: str) -> bool:
-        data = self._read(); items = data.get("templates", [])
-        n = len(items)
-        items = [t for t in items if t.get("id") != tmpl_id]
-        if len(items) == n:
+        data = self._read()
+        if tmpl_id not in self._by_id:
             return False
-        data["templates"] = items
+        data["templates"] = [t for t in data.get("templates", []) if t.get("id") != tmpl_id]
         self._write(data); return True
 
     def get(self, tmpl_id: str) -> Optional[dict]:
-        data = self._read()
-        for t in data.get("templates", []):
-            if t.get("id") == tmpl_id:
-                return t
-        return None
+        self._read()
+        return self._by_id.get(tmpl_id)
+
+    def get_by_name(self, name: str) -> Optional[dict]:
+        self._read()
+        return self._by_name.get(name)
 
 # ===== Menu de Contexto Customizado =====
 class CustomContextMenu(ctk.CTkToplevel):
@@ -983,23 +1287,34 @@ class CustomContextMenu(ctk.CTkToplevel):
                 btn.configure(text_color=THEME.color("danger_text"), hover_color=THEME.color("danger_hover"))
             btn.pack(fill="x", padx=6, pady=2)
 
-        self.update_idletasks()
-        content_width = menu_frame.winfo_reqwidth()
-        content_height = menu_frame.winfo_reqheight()
-        width = content_width + (outer_padx * 2) + (border_width * 2)
-        height = content_height + (outer_pady * 2) + (border_width * 2)
-        bounds = _get_monitor_bounds_for_point(event.x_root, event.y_root, self.app)
-        x, y = _clamp_to_bounds(event.x_root, event.y_root, width, height, bounds)
+        # O menu fica oculto até o conteúdo ser medido (winfo_reqwidth/reqheight no idle), sem forçar
+        # um update_idletasks síncrono; assim já aparece com o tamanho certo, em qualquer escala/fonte.
+        self._menu_frame = menu_frame
+        self._menu_padding = (outer_padx * 2) + (border_width * 2), (outer_pady * 2) + (border_width * 2)
+        self._anchor = (event.x_root, event.y_root)
+        self._measured: Optional[Tuple[int, int]] = None
+        self._fit_job: Optional[str] = self.after_idle(self._fit_to_content)
+        self.bind("<Escape>", lambda _e: self.destroy())
+
+    def _show(self, width: int, height: int):
+        bounds = _get_monitor_bounds_for_point(self._anchor[0], self._anchor[1], self.app)
+        x, y = _clamp_to_bounds(self._anchor[0], self._anchor[1], width, height, bounds)
         self.geometry(f"{width}x{height}+{int(x)}+{int(y)}")
         self.deiconify()
         self.lift()
 
         _animate_fade_in(self, duration=90, steps=5)
         self.after(10, self.focus_force)
-        self.bind("<Escape>", lambda _e: self.destroy())
 
-        self.bind_id = self.app.bind("<Button-1>", self._check_if_outside, add='+')
-        self.bind_id_secondary = self.app.bind("<Button-3>", self._check_if_outside, add='+')
+        # Com o grab local, cliques em qualquer ponto da aplicação chegam ao próprio menu;
+        # assim não há callback global em App rodando a cada clique enquanto nenhum menu está aberto.
+        try:
+            self.grab_set()
+            self.bind("<Button-1>", self._check_if_outside, add='+')
+            self.bind("<Button-3>", self._check_if_outside, add='+')
+        except tk.TclError:
+            self.bind_id = self.app.bind("<Button-1>", self._check_if_outside, add='+')
+            self.bind_id_secondary = self.app.bind("<Button-3>", self._check_if_outside, add='+')
         self.bind("<FocusOut>", lambda _e: self.destroy())
 
     def _build_options(self):
@@ -1039,6 +1354,23 @@ class CustomContextMenu(ctk.CTkToplevel):
 
         return flattened
 
+    def _fit_to_content(self):
+        """Mede o conteúdo já construído e só então posiciona e mostra o menu."""
+        self._fit_job = None
+        try:
+            if not self.winfo_exists():
+                return
+            pad_w, pad_h = self._menu_padding
+            size = (self._menu_frame.winfo_reqwidth() + pad_w, self._menu_frame.winfo_reqheight() + pad_h)
+        except tk.TclError:
+            return
+        if size != self._measured:
+            # A propagação da geometria dos botões pode cair no passo de idle seguinte: mede até estabilizar
+            self._measured = size
+            self._fit_job = self.after_idle(self._fit_to_content)
+            return
+        self._show(*size)
+
     def _create_command(self, func):
         def wrapper():
             self.destroy()
@@ -1053,6 +1385,10 @@ class CustomContextMenu(ctk.CTkToplevel):
             self.destroy()
 
     def destroy(self):
+        if getattr(self, '_fit_job', None):
+            try: self.after_cancel(self._fit_job)
+            except Exception: pass
+            self._fit_job = None
         if hasattr(self, 'bind_id'):
             self.app.unbind("<Button-1>", self.bind_id)
         if hasattr(self, 'bind_id_secondary'):
@@ -1166,8 +1502,8 @@ TYPE_VALUES = [
     "Componente do sistema",
     "Objeto",
 ]
-LIST_FIELD_TYPES = {"Lista", "Lista Vários"}
-MULTISELECT_FIELD_TYPES = {"Lista Vários"}
+LIST_FIELD_TYPES = frozenset({"Lista", "Lista Vários"})
+MULTISELECT_FIELD_TYPES = frozenset({"Lista Vários"})
 DEFAULT_COLS: List[Tuple[str, str, int]] = [
     ("move",  " ",                              60),
     ("sel",   "Sel.",                           48),
@@ -1184,6 +1520,8 @@ DEFAULT_COLS: List[Tuple[str, str, int]] = [
 MIN_W = {"move": 60, "sel": 44, "campo": 160, "tipo": 120, "origem": 160, "regras": 180, "obrig": 90, "soleit": 90, "opts": 180, "obs": 160, "del": 40}
 HEADER_ALIGN = {"move":"center", "sel":"center","campo":"w","tipo":"w","origem":"w","regras":"w","obrig":"center","soleit":"center","opts":"w","obs":"w","del":"center"}
 HEADER_PADX_LEFT = 10
+# (coluna, x, largura) de cada coluna; tupla imutável para poder ser memorizada e comparada
+ColPositions = Tuple[Tuple[str, int, int], ...]
 
 # ===== Classes da UI do Importador de BPMN (Copiado do Simulador) =====
 class EditItemDialog(ctk.CTkToplevel):
@@ -1257,16 +1595,42 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         self.diagrams_data = {}
         self.diagram_list = []
         self.current_tasks = []
+        self._task_index: Dict[str, int] = {}  # task_id -> posição em current_tasks
         self.current_fields_by_task = {}
         self.task_vars: Dict[str, tk.BooleanVar] = {}
         self.field_vars: Dict[str, tk.BooleanVar] = {}
+        # Cartões de tarefa reaproveitados entre renderizações (só são recriados quando o diagrama muda)
+        self._task_cards: Dict[str, Dict[str, Any]] = {}
+        self._packed_card_ids: List[str] = []
+        self._tree_message: Optional[ctk.CTkLabel] = None
+        # Materialização incremental: só o primeiro "ecrã" de cartões é criado de imediato
+        self._render_queue: deque = deque()  # (posição, tarefa) ainda por empacotar
+        self._render_target_ids: List[str] = []
+        self._render_job: Optional[str] = None
+        self._busy_cursor = False
         self.current_diagram_id: Optional[str] = None
         self.current_diagram_label: str = ""
         self.selected_task_ids: Set[str] = set()
         self.selected_field_ids: Set[str] = set()
+        # Universo de ids do diagrama atual (as seleções são sempre subconjuntos destes)
+        self._all_task_ids: Set[str] = set()
+        self._all_field_ids: Set[str] = set()
+        self._total_fields = 0
         self.original_task_order: List[str] = []
+        self._original_order_index: Dict[str, int] = {}
+        self._sort_keys: Dict[str, str] = {}  # task_id -> nome em casefold (ordenação alfabética)
         self.search_var = tk.StringVar()
+        self._search_haystacks: Dict[str, str] = {}  # task_id -> texto pesquisável (minúsculas)
+        self._options_previews: Dict[str, str] = {}  # field_id -> "Opções: ..." do cartão
+        self._search_after_id: Optional[str] = None
+        # Ids em exibição segundo o último filtro aplicado (recalculado só em render_tree)
+        self._filtered_task_ids: Set[str] = set()
+        # (filtro normalizado, tarefas filtradas); descartado quando a lista ou os textos das tarefas mudam
+        self._filter_cache: Optional[Tuple[str, List[Dict]]] = None
         self.selection_badge: Optional[ctk.CTkLabel] = None
+        # Fontes partilhadas por todos os cartões (CTkFont acompanha a escala sozinho)
+        self._font_bold = ctk.CTkFont(weight="bold")
+        self._font_task_title = ctk.CTkFont(size=15, weight="bold")
 
         self.main_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.main_frame.pack(fill="both", expand=True, padx=15, pady=15)
@@ -1276,6 +1640,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         
         self.setup_welcome_screen()
         self.setup_importer_screen()
+        self._bind_field_row_class()
 
         self.show_welcome_screen()
         self.after(250, self.run_import_flow)
@@ -1345,7 +1710,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
             text_color=THEME.color("text_muted"),
         ).pack(anchor="w", pady=(2, 0))
 
-        ctk.CTkLabel(header_card, text="Diagrama:", font=ctk.CTkFont(weight="bold")).grid(row=1, column=0, padx=(22, 12), pady=(4, 12), sticky="w")
+        ctk.CTkLabel(header_card, text="Diagrama:", font=self._font_bold).grid(row=1, column=0, padx=(22, 12), pady=(4, 12), sticky="w")
         self.diag_combobox = ctk.CTkComboBox(
             header_card,
             width=340,
@@ -1372,14 +1737,14 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         THEME.apply_button(btn_alpha, "ghost")
         btn_alpha.pack(side="top", fill="x", pady=(8, 0))
 
-        ctk.CTkLabel(header_card, text="Filtro rápido:", font=ctk.CTkFont(weight="bold")).grid(row=2, column=0, padx=(22, 12), pady=(0, 22), sticky="w")
+        ctk.CTkLabel(header_card, text="Filtro rápido:", font=self._font_bold).grid(row=2, column=0, padx=(22, 12), pady=(0, 22), sticky="w")
         search_entry = ctk.CTkEntry(
             header_card,
             textvariable=self.search_var,
             placeholder_text="Digite parte do nome da tarefa ou campo...",
         )
         search_entry.grid(row=2, column=1, sticky="ew", pady=(0, 22))
-        self.search_var.trace_add("write", lambda *_: self.render_tree())
+        self.search_var.trace_add("write", lambda *_: self._schedule_render())
 
         actions_frame = ctk.CTkFrame(self.importer_frame, fg_color="transparent")
         actions_frame.grid(row=1, column=0, sticky="ew", pady=(18, 12))
@@ -1417,7 +1782,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
             return
 
         try:
-            diags, nodes, trans = parse_bizagi_group_by_diagram(path)
+            diags, nodes, trans = parse_bizagi_group_by_diagram_cached(path)
             if not diags:
                 messagebox.showwarning("Aviso", "Nenhum diagrama válido foi encontrado no ficheiro.", parent=self)
                 self.destroy()
@@ -1448,10 +1813,18 @@ class BPMNImporterWindow(ctk.CTkToplevel):
             self.current_diagram_id = None
             self.current_diagram_label = selected_label or ""
             self.current_tasks = []
+            self._task_index = {}
+            self._filter_cache = None
             self.current_fields_by_task = {}
             self.original_task_order = []
+            self._original_order_index = {}
+            self._sort_keys = {}
             self.selected_task_ids.clear()
             self.selected_field_ids.clear()
+            self._all_task_ids = set()
+            self._all_field_ids = set()
+            self._total_fields = 0
+            self._discard_task_cards()
             self.render_tree()
             return
 
@@ -1463,14 +1836,23 @@ class BPMNImporterWindow(ctk.CTkToplevel):
             data = self.diagrams_data[diag_id]
             tasks, fields_by_task = build_task_fields_for_diagram(data["nodes"], data["transitions"])
             self.current_tasks = tasks
+            self._reindex_tasks()
             self.current_fields_by_task = fields_by_task
+            self._search_haystacks.clear()
+            self._options_previews.clear()
+            self._discard_task_cards()
             self.original_task_order = [t["id"] for t in tasks]
-            self.selected_task_ids = {t["id"] for t in tasks}
-            self.selected_field_ids = {
+            self._original_order_index = {tid: idx for idx, tid in enumerate(self.original_task_order)}
+            self._sort_keys = {t["id"]: (t.get("name", "") or "").casefold() for t in tasks}
+            self._all_task_ids = set(self.original_task_order)
+            self._all_field_ids = {
                 field["id"]
                 for task in tasks
                 for field in self.current_fields_by_task.get(task["id"], [])
             }
+            self._total_fields = sum(len(self.current_fields_by_task.get(t["id"], [])) for t in tasks)
+            self.selected_task_ids = set(self._all_task_ids)
+            self.selected_field_ids = set(self._all_field_ids)
 
         self.render_tree()
 
@@ -1478,30 +1860,14 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         if not (checkbox.winfo_x() <= event.x < checkbox.winfo_x() + checkbox.winfo_width()):
              self.open_edit_dialog(item, item_type, checkbox)
 
-    def _prune_selection(self) -> None:
-        valid_task_ids = {t["id"] for t in self.current_tasks}
-        valid_field_ids = {
-            field["id"]
-            for task in self.current_tasks
-            for field in self.current_fields_by_task.get(task["id"], [])
-        }
-        self.selected_task_ids &= valid_task_ids
-        self.selected_field_ids &= valid_field_ids
-
     def _update_selection_badge(self, visible_count: int) -> None:
         if not self.selection_badge:
             return
-        total_tasks = len(self.current_tasks)
-        total_fields = sum(len(self.current_fields_by_task.get(t["id"], [])) for t in self.current_tasks)
-        selected_tasks = len(self.selected_task_ids & {t["id"] for t in self.current_tasks})
-        selected_fields = len(
-            self.selected_field_ids
-            & {
-                field["id"]
-                for task in self.current_tasks
-                for field in self.current_fields_by_task.get(task["id"], [])
-            }
-        )
+        # As seleções só mudam por toggles de itens do diagrama atual ou ao recarregar, logo já estão podadas
+        total_tasks = len(self._all_task_ids)
+        total_fields = self._total_fields
+        selected_tasks = len(self.selected_task_ids)
+        selected_fields = len(self.selected_field_ids)
         text = "Nenhuma tarefa disponível"
         if total_tasks:
             if total_fields:
@@ -1518,81 +1884,240 @@ class BPMNImporterWindow(ctk.CTkToplevel):
     def _filtered_tasks(self) -> List[Dict]:
         if not self.current_tasks:
             return []
-        self._prune_selection()
         query = self.search_var.get().strip().lower()
-        visible_tasks: List[Dict] = []
-        for task in self.current_tasks:
+        cached = self._filter_cache
+        if cached is not None and cached[0] == query:
+            return cached[1]
+        if not query:
+            result = list(self.current_tasks)
+        else:
+            result = [task for task in self.current_tasks if query in self._task_haystack(task)]
+        self._filter_cache = (query, result)
+        return result
+
+    def _task_haystack(self, task: Dict) -> str:
+        """Nome da tarefa, nomes e opções dos campos, em minúsculas, separados por quebra de linha."""
+        haystack = self._search_haystacks.get(task["id"])
+        if haystack is None:
             fields = self.current_fields_by_task.get(task["id"], [])
-            if not query:
-                visible_tasks.append(task)
-                continue
-            search_pool = [task.get("name", "")] + [f.get("campo", "") for f in fields]
+            parts = [task.get("name", "")] + [f.get("campo", "") for f in fields]
             for f in fields:
-                search_pool.extend(f.get("opcoes", []))
-            if any(query in (item or "").lower() for item in search_pool):
-                visible_tasks.append(task)
-        return visible_tasks
+                parts.extend(f.get("opcoes", []))
+            # "\n" não aparece na busca (Entry de uma linha), então nenhum termo casa entre dois itens
+            haystack = self._search_haystacks[task["id"]] = "\n".join((item or "") for item in parts).lower()
+        return haystack
+
+    def _schedule_render(self) -> None:
+        """Agrupa as teclas digitadas no filtro numa única renderização (120 ms após a última)."""
+        if self._search_after_id:
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+        self._search_after_id = self.after(120, self.render_tree)
 
-    def render_tree(self) -> None:
-        for widget in self.tree_scroll_frame.winfo_children():
-            widget.destroy()
-        self.task_vars.clear()
-        self.field_vars.clear()
+    def destroy(self):
+        if self._search_after_id:
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+            self._search_after_id = None
+        self._cancel_render_job()
+        super().destroy()
+
+    def _cancel_render_job(self) -> None:
+        if self._render_job:
+            try:
+                self.after_cancel(self._render_job)
+            except Exception:
+                pass
+            self._render_job = None
+        self._render_queue = deque()
+        self._set_busy_cursor(False)
 
+    def render_tree(self) -> None:
+        if self._search_after_id:
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+            self._search_after_id = None
         if not self.current_tasks:
-            ctk.CTkLabel(
-                self.tree_scroll_frame,
-                text="Carregue um diagrama para visualizar tarefas.",
-                text_color=THEME.color("text_muted"),
-            ).pack(pady=40)
+            self._filtered_task_ids = set()
+            self._show_tree_message("Carregue um diagrama para visualizar tarefas.")
             self._update_selection_badge(0)
             return
 
         visible_tasks = self._filtered_tasks()
+        self._filtered_task_ids = {task["id"] for task in visible_tasks}
 
         if not visible_tasks:
-            ctk.CTkLabel(
-                self.tree_scroll_frame,
-                text="Nenhum resultado encontrado para o filtro informado.",
-                text_color=THEME.color("text_muted"),
-            ).pack(pady=40)
+            self._show_tree_message("Nenhum resultado encontrado para o filtro informado.")
             self._update_selection_badge(0)
             return
 
-        for idx, task in enumerate(visible_tasks, start=1):
-            self.render_task_item(task, idx)
+        if self._tree_message is not None:
+            self._tree_message.pack_forget()
+
+        visible_ids = [task["id"] for task in visible_tasks]
+        if visible_ids == self._render_target_ids and (self._render_queue or visible_ids == self._packed_card_ids):
+            # Mesmas tarefas na mesma ordem: cartões e numeração já estão corretos (ou a caminho), só sincroniza as seleções
+            self._sync_selection_vars()
+            self._update_selection_badge(len(visible_tasks))
+            return
+
+        if (
+            not self._render_queue
+            and len(visible_ids) == len(self._packed_card_ids)
+            and set(visible_ids) == set(self._packed_card_ids)
+        ):
+            # Mesmas tarefas noutra ordem (▲/▼, A-Z, ordem do BPMN): só reposiciona os cartões fora do lugar
+            self._reorder_packed_cards(visible_ids)
+            self._update_selection_badge(len(visible_tasks))
+            return
+
+        self._cancel_render_job()
+        for task_id in self._packed_card_ids:
+            card = self._task_cards.get(task_id)
+            if card is not None:
+                card["frame"].pack_forget()
+        self._packed_card_ids = []
+        self._render_target_ids = visible_ids
+        self._render_queue = deque(enumerate(visible_tasks, start=1))
+        self._set_busy_cursor(True)
+        self._render_next_batch()
 
         self._update_selection_badge(len(visible_tasks))
 
-    def render_task_item(self, task: Dict, position: int):
+    _RENDER_BATCH = 12  # cartões novos por passo (~ o que cabe na área visível)
+
+    def _render_next_batch(self) -> None:
+        """Empacota os cartões em ordem; cartões ainda não criados são construídos em lotes via after()."""
+        self._render_job = None
+        created = 0
+        queue = self._render_queue
+        while queue:
+            idx, task = queue[0]
+            card = self._task_cards.get(task["id"])
+            if card is None:
+                if created >= self._RENDER_BATCH:
+                    self._render_job = self.after(1, self._render_next_batch)
+                    return
+                card = self._task_cards[task["id"]] = self.render_task_item(task)
+                created += 1
+            queue.popleft()
+            badge_text = f"{idx:02d}"
+            if card["position"] != badge_text:
+                card["badge"].configure(text=badge_text)
+                card["position"] = badge_text
+            card["frame"].pack(fill="x", pady=(0, 16), padx=18)
+            self._packed_card_ids.append(task["id"])
+        self._set_busy_cursor(False)
+
+    def _set_busy_cursor(self, busy: bool) -> None:
+        """Cursor de espera enquanto há cartões por materializar."""
+        if busy == self._busy_cursor:
+            return
+        self._busy_cursor = busy
+        try:
+            self.configure(cursor="watch" if busy else "")
+        except Exception:
+            pass
+
+    def _reorder_packed_cards(self, visible_ids: List[str]) -> None:
+        """Reordena os cartões já empacotados com pack(before=...), sem desempacotar os que não mudam de lugar."""
+        cards = self._task_cards
+        current = list(self._packed_card_ids)
+        for pos, task_id in enumerate(visible_ids):
+            card = cards[task_id]
+            if current[pos] != task_id:
+                card["frame"].pack(before=cards[current[pos]]["frame"])
+                current.remove(task_id)
+                current.insert(pos, task_id)
+            badge_text = f"{pos + 1:02d}"
+            if card["position"] != badge_text:
+                card["badge"].configure(text=badge_text)
+                card["position"] = badge_text
+        self._packed_card_ids = current
+        self._render_target_ids = list(visible_ids)
+
+    def _sync_selection_vars(self) -> None:
+        for task_id, var in self.task_vars.items():
+            selected = task_id in self.selected_task_ids
+            if var.get() != selected:
+                var.set(selected)
+        for field_id, var in self.field_vars.items():
+            selected = field_id in self.selected_field_ids
+            if var.get() != selected:
+                var.set(selected)
+
+    def _show_tree_message(self, text: str) -> None:
+        self._cancel_render_job()
+        self._render_target_ids = []
+        for task_id in self._packed_card_ids:
+            card = self._task_cards.get(task_id)
+            if card is not None:
+                card["frame"].pack_forget()
+        self._packed_card_ids = []
+        if self._tree_message is None:
+            self._tree_message = ctk.CTkLabel(self.tree_scroll_frame, text=text, text_color=THEME.color("text_muted"))
+        else:
+            self._tree_message.configure(text=text)
+        self._tree_message.pack(pady=40)
+
+    def _discard_task_cards(self, task_ids: Optional[List[str]] = None) -> None:
+        """Destroi os cartões (todos ou só os indicados) para serem recriados na próxima renderização."""
+        self._cancel_render_job()
+        self._render_target_ids = []
+        for task_id in list(self._task_cards) if task_ids is None else task_ids:
+            card = self._task_cards.pop(task_id, None)
+            if card is None:
+                continue
+            self.task_vars.pop(task_id, None)
+            for field in self.current_fields_by_task.get(task_id, []):
+                self.field_vars.pop(field["id"], None)
+            try:
+                card["frame"].destroy()
+            except Exception:
+                pass
+        if task_ids is None:
+            self.task_vars.clear()
+            self.field_vars.clear()
+            self._packed_card_ids = []
+        else:
+            self._packed_card_ids = [tid for tid in self._packed_card_ids if tid in self._task_cards]
+
+    def render_task_item(self, task: Dict) -> Dict[str, Any]:
+        """Cria (sem empacotar) o cartão de uma tarefa; render_tree posiciona e numera."""
         task_id = task['id']
         task_var = tk.BooleanVar(value=task_id in self.selected_task_ids)
         self.task_vars[task_id] = task_var
+        palette = THEME.palette
 
         task_card = ctk.CTkFrame(
             self.tree_scroll_frame,
-            fg_color=THEME.color("surface"),
+            fg_color=palette.surface,
             corner_radius=16,
         )
         _safe_configure(
             task_card,
             border_width=1,
-            border_color=THEME.color("surface_border"),
+            border_color=palette.surface_border,
         )
-        task_card.pack(fill="x", pady=(0, 16), padx=18)
 
         task_header = ctk.CTkFrame(task_card, fg_color="transparent", cursor="hand2")
         task_header.pack(fill="x", pady=(14, 8), padx=18)
 
         badge = ctk.CTkLabel(
             task_header,
-            text=f"{position:02d}",
+            text="",
             width=44,
-            fg_color=THEME.color("badge_bg"),
+            fg_color=palette.badge_bg,
             corner_radius=8,
-            font=ctk.CTkFont(weight="bold"),
+            font=self._font_bold,
             anchor="center",
-            text_color=THEME.color("badge_text"),
+            text_color=palette.badge_text,
         )
         badge.pack(side="left", padx=(0, 12))
 
@@ -1600,7 +2125,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
             task_header,
             text=task['name'],
             variable=task_var,
-            font=ctk.CTkFont(size=15, weight="bold"),
+            font=self._font_task_title,
             command=lambda t_id=task_id: self.on_task_toggle(t_id),
         )
         chk_task.pack(side="left", padx=(0, 12))
@@ -1609,7 +2134,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         ctk.CTkLabel(
             task_header,
             text=f"{len(task_fields)} campo(s)",
-            text_color=THEME.color("text_muted"),
+            text_color=palette.text_muted,
         ).pack(side="left")
 
         controls = ctk.CTkFrame(task_header, fg_color="transparent")
@@ -1633,43 +2158,65 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         THEME.apply_button(btn_down, "ghost")
         btn_down.pack(side="left")
 
+        # Eventos tratados pela tag de classe "BPMNTaskHeader" (ver _bind_field_row_class); só o cabeçalho abre a edição
         for widget in (task_card, task_header, badge):
-            widget.bind("<Enter>", lambda _e, w=task_card: w.configure(fg_color=THEME.color("surface_hover")))
-            widget.bind("<Leave>", lambda _e, w=task_card: w.configure(fg_color=THEME.color("surface")))
-
-        task_header.bind("<Button-1>", lambda e, t=task, c=chk_task: self.handle_row_click(e, t, "task", c))
+            row_info = (task_card, task, chk_task, widget is task_header)
+            for target in _ctk_event_targets(widget):
+                target._bpmn_task_row = row_info
+                target.bindtags(("BPMNTaskHeader",) + target.bindtags())
 
         if task_fields:
-            fields_frame = ctk.CTkFrame(task_card, fg_color=THEME.color("surface_low"), corner_radius=12)
-            fields_frame.pack(fill="x", padx=16, pady=(0, 14))
+            fields_frame = ctk.CTkFrame(task_card, fg_color=palette.surface_low, corner_radius=12)
             for field in task_fields:
                 self.render_field_item(field, task_id, fields_frame)
+            # Empacotado só depois dos filhos: o packer calcula o tamanho uma vez
+            fields_frame.pack(fill="x", padx=16, pady=(0, 14))
         else:
             ctk.CTkLabel(
                 task_card,
                 text="Nenhum campo de decisão encontrado neste passo.",
-                text_color=THEME.color("text_muted"),
+                text_color=palette.text_muted,
             ).pack(fill="x", padx=18, pady=(0, 16))
 
+        return {"frame": task_card, "badge": badge, "position": ""}
+
+    def _reindex_tasks(self) -> None:
+        self._task_index = {t['id']: i for i, t in enumerate(self.current_tasks)}
+        self._filter_cache = None
+
     def reorder_task(self, task_id: str, delta: int) -> None:
-        index = next((i for i, t in enumerate(self.current_tasks) if t['id'] == task_id), -1)
+        index = self._task_index.get(task_id, -1)
         if index == -1:
             return
         new_index = index + delta
         if not (0 <= new_index < len(self.current_tasks)):
             return
-        self.current_tasks.insert(new_index, self.current_tasks.pop(index))
+        tasks = self.current_tasks
+        if abs(delta) == 1:
+            # ▲/▼ trocam vizinhos: só as duas posições mudam
+            tasks[index], tasks[new_index] = tasks[new_index], tasks[index]
+            self._task_index[tasks[index]['id']] = index
+            self._task_index[task_id] = new_index
+            self._filter_cache = None
+        else:
+            tasks.insert(new_index, tasks.pop(index))
+            self._reindex_tasks()
         self.render_tree()
 
     def sort_tasks_alphabetically(self) -> None:
-        self.current_tasks.sort(key=lambda t: (t.get('name', '') or '').lower())
+        # Chaves (nome em casefold) calculadas ao carregar o diagrama e ao renomear a tarefa
+        sort_keys = self._sort_keys
+        self.current_tasks.sort(key=lambda t: sort_keys.get(t['id'], ""))
+        self._reindex_tasks()
         self.render_tree()
 
     def restore_original_order(self) -> None:
         if not self.original_task_order:
             return
-        order_map = {tid: idx for idx, tid in enumerate(self.original_task_order)}
-        self.current_tasks.sort(key=lambda t: order_map.get(t['id'], len(order_map)))
+        order_map = self._original_order_index
+        missing = len(order_map)
+        self.current_tasks.sort(key=lambda t: order_map.get(t['id'], missing))
+        self._reindex_tasks()
         self.render_tree()
 
     def render_field_item(self, field: Dict, task_id: str, parent_card: ctk.CTkFrame):
@@ -1677,64 +2224,119 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         field_var = tk.BooleanVar(value=field_id in self.selected_field_ids)
         self.field_vars[field_id] = field_var
 
-        wrapper = ctk.CTkFrame(parent_card, fg_color="transparent")
-        wrapper.pack(fill="x", padx=12, pady=6)
-
+        palette = THEME.palette
+        # Uma única moldura por campo; checkbox, textos e chip do tipo ficam em grid dentro dela
         field_row = ctk.CTkFrame(
-            wrapper,
-            fg_color=THEME.color("field_surface"),
+            parent_card,
+            fg_color=palette.field_surface,
             corner_radius=10,
             cursor="hand2",
         )
         _safe_configure(
             field_row,
             border_width=1,
-            border_color=THEME.color("field_border"),
+            border_color=palette.field_border,
         )
-        field_row.pack(fill="x")
-
-        content_frame = ctk.CTkFrame(field_row, fg_color="transparent")
-        content_frame.pack(fill="x", padx=14, pady=10)
+        field_row.grid_columnconfigure(1, weight=1)
 
         chk_field = ctk.CTkCheckBox(
-            content_frame,
+            field_row,
             text="",
             variable=field_var,
             command=lambda fid=field_id, tid=task_id: self.on_field_toggle(tid, fid),
         )
-        chk_field.pack(side="left")
+        chk_field.grid(row=0, column=0, rowspan=2, padx=(14, 0), pady=10, sticky="w")
 
-        label_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
-        label_frame.pack(side="left", fill="both", expand=True, padx=(10, 0))
-
-        ctk.CTkLabel(label_frame, text=field['campo'], font=ctk.CTkFont(weight="bold")).pack(anchor="w")
+        has_options = bool(field['opcoes'])
+        ctk.CTkLabel(field_row, text=field['campo'], font=self._font_bold).grid(
+            row=0, column=1, sticky="w", padx=(10, 0), pady=(10, 0) if has_options else 10
+        )
         ctk.CTkLabel(
-            content_frame,
+            field_row,
             text=field['tipo'],
-            fg_color=THEME.color("chip_bg"),
-            text_color=THEME.color("chip_text"),
+            fg_color=palette.chip_bg,
+            text_color=palette.chip_text,
             corner_radius=8,
             padx=12,
             pady=4,
-        ).pack(side="right")
+        ).grid(row=0, column=2, rowspan=2, padx=(10, 14), pady=10, sticky="e")
 
-        if field['opcoes']:
+        if has_options:
             ctk.CTkLabel(
-                label_frame,
-                text=f"Opções: {', '.join(field['opcoes'])}",
-                text_color=THEME.color("text_muted"),
+                field_row,
+                text=self._options_preview(field),
+                text_color=palette.text_muted,
                 wraplength=420,
                 justify="left",
-            ).pack(anchor="w", pady=(4, 0))
+            ).grid(row=1, column=1, sticky="w", padx=(10, 0), pady=(4, 10))
+
+        field_row.pack(fill="x", padx=12, pady=6)
+
+        # Eventos tratados pela tag de classe "BPMNFieldRow" (ver _bind_field_row_class); o widget só carrega a referência
+        row_info = (field_row, field, chk_field)
+        for target in _ctk_event_targets(field_row):
+            target._bpmn_field_row = row_info
+            target.bindtags(("BPMNFieldRow",) + target.bindtags())
+
+    _OPTIONS_PREVIEW_MAX = 8  # opções mostradas no cartão; a busca continua a considerar todas
+
+    def _options_preview(self, field: Dict) -> str:
+        """Texto "Opções: a, b, …" do cartão, calculado uma vez por campo."""
+        preview = self._options_previews.get(field['id'])
+        if preview is None:
+            opts = field['opcoes']
+            shown = ', '.join(opts[:self._OPTIONS_PREVIEW_MAX])
+            if len(opts) > self._OPTIONS_PREVIEW_MAX:
+                shown += f", … (+{len(opts) - self._OPTIONS_PREVIEW_MAX})"
+            preview = self._options_previews[field['id']] = f"Opções: {shown}"
+        return preview
+
+    def _bind_field_row_class(self) -> None:
+        """Registra uma única vez os handlers de hover/clique das linhas de campo e dos cabeçalhos de tarefa."""
+        self.bind_class("BPMNFieldRow", "<Enter>", self._on_field_row_enter)
+        self.bind_class("BPMNFieldRow", "<Leave>", self._on_field_row_leave)
+        self.bind_class("BPMNFieldRow", "<Button-1>", self._on_field_row_click)
+        self.bind_class("BPMNTaskHeader", "<Enter>", self._on_task_header_enter)
+        self.bind_class("BPMNTaskHeader", "<Leave>", self._on_task_header_leave)
+        self.bind_class("BPMNTaskHeader", "<Button-1>", self._on_task_header_click)
 
-        def _open_editor(event):
-            self.handle_row_click(event, field, "field", chk_field)
+    @staticmethod
+    def _task_row_info(event):
+        return getattr(event.widget, "_bpmn_task_row", None)
+
+    def _on_task_header_enter(self, event):
+        info = self._task_row_info(event)
+        if info:
+            info[0].configure(fg_color=THEME.palette.surface_hover)
+
+    def _on_task_header_leave(self, event):
+        info = self._task_row_info(event)
+        if info:
+            info[0].configure(fg_color=THEME.palette.surface)
 
-        for widget in (field_row, content_frame, label_frame):
-            widget.bind("<Enter>", lambda _e, w=field_row: w.configure(fg_color=THEME.color("field_hover")))
-            widget.bind("<Leave>", lambda _e, w=field_row: w.configure(fg_color=THEME.color("field_surface")))
-            widget.bind("<Button-1>", _open_editor)
+    def _on_task_header_click(self, event):
+        info = self._task_row_info(event)
+        if info and info[3]:
+            self.handle_row_click(event, info[1], "task", info[2])
+
+    @staticmethod
+    def _field_row_info(event):
+        return getattr(event.widget, "_bpmn_field_row", None)
 
+    def _on_field_row_enter(self, event):
+        info = self._field_row_info(event)
+        if info:
+            info[0].configure(fg_color=THEME.palette.field_hover)
+
+    def _on_field_row_leave(self, event):
+        info = self._field_row_info(event)
+        if info:
+            info[0].configure(fg_color=THEME.palette.field_surface)
+
+    def _on_field_row_click(self, event):
+        info = self._field_row_info(event)
+        if info:
+            self.handle_row_click(event, info[1], "field", info[2])
 
     def on_task_toggle(self, task_id: str):
         is_selected = self.task_vars[task_id].get()
@@ -1743,7 +2345,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         else:
             self.selected_task_ids.discard(task_id)
 
-        self._update_selection_badge(len(self._filtered_tasks()))
+        self._update_selection_badge(len(self._filtered_task_ids))
 
     def on_field_toggle(self, task_id: str, field_id: str) -> None:
         selected = self.field_vars[field_id].get()
@@ -1752,7 +2354,7 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         else:
             self.selected_field_ids.discard(field_id)
 
-        self._update_selection_badge(len(self._filtered_tasks()))
+        self._update_selection_badge(len(self._filtered_task_ids))
 
     def open_edit_dialog(self, item: Dict, item_type: str, checkbox_widget: ctk.CTkCheckBox):
         dialog = EditItemDialog(self, item, item_type)
@@ -1766,29 +2368,47 @@ class BPMNImporterWindow(ctk.CTkToplevel):
         if dialog.result:
             if item_type == "task":
                 item['name'] = dialog.result['name']
+                self._sort_keys[item['id']] = (item['name'] or "").casefold()
             elif item_type == "field":
                 item['campo'] = dialog.result['name']
                 item['opcoes'] = dialog.result['opcoes']
+                self._options_previews.pop(item['id'], None)
+            self._search_haystacks.clear()
+            self._filter_cache = None
+
+            # Só o cartão afetado é recriado
+            if item_type == "task":
+                owner_id = item['id']
+            else:
+                owner_id = next(
+                    (tid for tid, fields in self.current_fields_by_task.items() if any(f is item for f in fields)),
+                    None,
+                )
+            self._discard_task_cards([owner_id] if owner_id is not None else None)
 
             # Atualiza a interface gráfica para mostrar as alterações
             self.render_tree()
 
     def confirm_selection(self):
-        selected_tasks = [task for task in self.current_tasks if task['id'] in self.selected_task_ids]
-
-        if not selected_tasks:
-            messagebox.showwarning("Importador de BPMN", "Selecione ao menos uma tarefa antes de importar.", parent=self)
-            return
-
+        selected_task_ids = self.selected_task_ids
+        selected_field_ids = self.selected_field_ids
+        fields_by_task = self.current_fields_by_task
+        # Uma única passagem pelas tarefas (na ordem atual), filtrando os campos de cada uma
+        selected_tasks = []
         selected_fields_by_task = {}
-        for task in selected_tasks:
+        for task in self.current_tasks:
             task_id = task['id']
+            if task_id not in selected_task_ids:
+                continue
+            selected_tasks.append(task)
             selected_fields_by_task[task_id] = [
-                field
-                for field in self.current_fields_by_task.get(task_id, [])
-                if field['id'] in self.selected_field_ids
+                field for field in fields_by_task.get(task_id, ()) if field['id'] in selected_field_ids
             ]
 
+        if not selected_tasks:
+            messagebox.showwarning("Importador de BPMN", "Selecione ao menos uma tarefa antes de importar.", parent=self)
+            return
+
         self.result = {
             "tasks": selected_tasks,
             "fields_by_task": selected_fields_by_task,
@@ -1804,6 +2424,14 @@ class App(ctk.CTk):
     def __init__(self):
         super().__init__()
         self._resize_timer = None
+        self._xview_job: Optional[str] = None
+        self._wheel_after = None
+        self._wheel_accum_y = 0
+        self._wheel_accum_x = 0
+        self._last_resize_layout: Optional[Tuple[int, int, int]] = None  # (largura, altura, largura da tabela)
+        # Últimas medidas aplicadas por _resize_header/_resize_rows
+        self._last_header_layout: Optional[Tuple[int, int, int]] = None  # (largura da tabela, viewport, altura do cabeçalho)
+        self._last_rows_layout: Optional[Tuple[int, int, int]] = None  # (largura da tabela, viewport, altura do conteúdo)
         global _APP_ROOT
         _APP_ROOT = self
         self.title(f"Designer de Campos — Fluxos [{APP_VERSION}]")
@@ -1817,8 +2445,21 @@ class App(ctk.CTk):
         self.row_h = max(36, int(round(36 * self.tk_scale)))
         self.header_h = self.row_h
 
+        # Config de layout já lida + assinatura (mtime_ns, tamanho) do arquivo de onde veio
+        self._json_cache: Optional[dict] = None
+        self._cols_save_job: Optional[str] = None
+        self._json_sig: Optional[Tuple[int, int]] = None
         self.cols = self._load_cols_config()
         self.col_gap = self._load_col_gap_config(default=max(5, int(round(5 * self.tk_scale))))
+        # Geometria das colunas memorizada; _cols_changed() invalida após qualquer mudança em cols/col_gap
+        self._cols_version = 0
+        self._cols_geometry: Optional[Tuple[int, ColPositions, int]] = None
+        # Posições já aplicadas a todas as células/divisores; None quando há células por posicionar
+        self._applied_positions: Optional[ColPositions] = None
+        self._label_by_key: Dict[str, str] = {k: label for k, label, _ in self.cols}
+        self._col_width_by_key: Dict[str, int] = {k: int(w) for k, _, w in self.cols}
+        # (posições, {coluna: (x, largura)}) da última grade montada; reaproveitado linha a linha
+        self._pos_index: Optional[Tuple[ColPositions, Dict[str, Tuple[int, int]]]] = None
 
         self.project = ProjectModel()
         self.current_task_id: Optional[str] = None
@@ -1830,29 +2471,47 @@ class App(ctk.CTk):
         self.context_menu: Optional[CustomContextMenu] = None
         self.shortcuts_window: Optional[ShortcutOverlay] = None
         self.validator_ignored: Set[str] = set()
+        self._toast: Optional[ctk.CTkLabel] = None
+        self._toast_job: Optional[str] = None
 
         # --- Cache de Metadados ---
         self._field_id_to_name: Dict[str, str] = {}
         self._task_id_to_name: Dict[str, str] = {}
         self._field_id_to_task_id: Dict[str, str] = {}
+        self._field_by_id: Dict[str, Field] = {}
         
         # estado da visão HTML (fases colapsadas)
         self._html_overview_collapsed: Set[str] = set()
 
-        # Undo/Redo
-        self._undo_stack: List[dict] = []
+        # Undo/Redo (os quadros partilham os dicts de campos que não mudaram entre si)
+        self._UNDO_MAX = 50
+        self._undo_stack: deque = deque(maxlen=self._UNDO_MAX)
+        # (campo, atributo, valor) vindos de <FocusOut>, aplicados juntos por _flush_pending_commits
+        self._pending_commits: List[Tuple[Field, str, str]] = []
+        self._commit_job: Optional[str] = None
         self._redo_stack: List[dict] = []
+        self._undo_field_memo: Dict[str, Tuple[tuple, dict]] = {}
         self._clipboard: Dict = {} # Alterado para Dict para armazenar a tarefa de origem
-        self._UNDO_MAX = 50
 
         # registradores UI da grade principal
         self._resizers: List[tk.Frame] = []
+        self._resizer_positions: Optional[ColPositions] = None
         self._resizer_state: Optional[Dict[str, int]] = None
         self._resizer_guide: Optional[tk.Frame] = None
         self._rows: List[ctk.CTkFrame] = []
-        self._row_cells: Dict[int, Dict[str, ctk.CTkFrame]] = {}
+        self._row_cells: List[Dict[str, ctk.CTkFrame]] = []  # paralela a _rows: células por coluna de cada linha
         self._header_cells: Dict[str, ctk.CTkFrame] = {}
         self._field_row_map: Dict[str, ctk.CTkFrame] = {}
+        # Construção incremental das linhas: (tarefa, próximo índice) ainda por criar
+        self._row_build: Optional[Tuple[Task, int]] = None
+        self._row_build_job: Optional[str] = None
+        self._rows_reveal_job: Optional[str] = None  # after_idle que volta a mostrar as linhas (ver _refresh_rows)
+        # Atualização agrupada (combo + linhas + simulador) pedida pelo diálogo de tarefas
+        self._ui_refresh_job: Optional[str] = None
+        # field_id -> {"campo"/"opts"/"obs": CTkEntry} das linhas visíveis (lidos por _commit_row_data)
+        self._row_inputs: Dict[str, Dict[str, ctk.CTkEntry]] = {}
+        # field_id -> widgets da linha que _update_single_row_widgets atualiza (+ "opts_kind": "entry"/"button")
+        self._row_widgets: Dict[str, Dict[str, Any]] = {}
 
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -1880,8 +2539,10 @@ class App(ctk.CTk):
         self.bind("<FocusIn>", _wake_up_window)
         # -------------------------------------------------------
 
-        self.new_flow_blank(show_message=False)
-        self._rebuild_metadata_cache() # Inicializa o cache
+        # Mover/redimensionar a janela principal pode trocá-la de monitor
+        _watch_monitor_changes(self)
+
+        self.new_flow_blank(show_message=False)  # também inicializa o cache de metadados
 
     # --- Cache de Metadados ---
     def _rebuild_metadata_cache(self):
@@ -1889,12 +2550,40 @@ class App(ctk.CTk):
         self._field_id_to_name.clear()
         self._task_id_to_name.clear()
         self._field_id_to_task_id.clear()
+        self._field_by_id.clear()
 
         for task in self.project.tasks:
             self._task_id_to_name[task.id] = task.name
             for field in task.fields:
                 self._field_id_to_name[field.id] = field.name
                 self._field_id_to_task_id[field.id] = task.id
+                self._field_by_id[field.id] = field
+
+    # Atualizações parciais do cache: usadas quando só algumas tarefas/campos mudam
+    def _add_task_to_cache(self, task: Task):
+        self._task_id_to_name[task.id] = task.name
+        for field in task.fields:
+            self._field_id_to_name[field.id] = field.name
+            self._field_id_to_task_id[field.id] = task.id
+            self._field_by_id[field.id] = field
+
+    def _add_field_to_cache(self, task: Task, field: Field):
+        self._field_id_to_name[field.id] = field.name
+        self._field_id_to_task_id[field.id] = task.id
+        self._field_by_id[field.id] = field
+
+    def _remove_task_from_cache(self, task: Task):
+        self._task_id_to_name.pop(task.id, None)
+        self._remove_fields_from_cache(f.id for f in task.fields)
+
+    def _remove_fields_from_cache(self, field_ids):
+        for fid in field_ids:
+            self._field_id_to_name.pop(fid, None)
+            self._field_id_to_task_id.pop(fid, None)
+            self._field_by_id.pop(fid, None)
+
+    def _rename_field_in_cache(self, field: Field):
+        self._field_id_to_name[field.id] = field.name
 
     # ===== Menus =====
     def _build_menubar(self):
@@ -2002,33 +2691,58 @@ class App(ctk.CTk):
         if selected_diag_label:
             self.project.flow_name = selected_diag_label
 
+        fields_by_task = imported_data["fields_by_task"]
+        uid = _uid
         for task_data in imported_data["tasks"]:
-            # Cria a nova tarefa
-            new_task = Task(id=_uid(), name=task_data["name"], fields=[])
-
-            # Cria os campos para esta tarefa
-            fields_for_this_task = imported_data["fields_by_task"].get(task_data["id"], [])
-            for field_data in fields_for_this_task:
-                new_field = Field(
-                    id=_uid(),
-                    name=field_data["campo"],
-                    ftype="Lista", # BPMN só importa campos de decisão (Lista)
-                    options="; ".join(field_data["opcoes"])
-                )
-                new_task.fields.append(new_field)
-
-            newly_added_tasks.append(new_task)
+            # Cria a nova tarefa já com os seus campos (BPMN só importa campos de decisão: Lista)
+            newly_added_tasks.append(Task(
+                id=uid(),
+                name=task_data["name"],
+                fields=[
+                    Field(id=uid(), name=field_data["campo"], ftype="Lista", options="; ".join(field_data["opcoes"]))
+                    for field_data in fields_by_task.get(task_data["id"], ())
+                ],
+            ))
 
         # Adiciona as novas tarefas ao projeto (operação aditiva)
         self.project.tasks.extend(newly_added_tasks)
 
-        # Atualiza a interface de forma segura
-        self._rebuild_metadata_cache()
+        # Atualiza a interface de forma segura (o cache só recebe as tarefas novas)
+        for new_task in newly_added_tasks:
+            self._add_task_to_cache(new_task)
         self._refresh_task_combo()
         self._refresh_rows()
         self._refresh_flow_label()
 
-        messagebox.showinfo("Sucesso", f"{len(newly_added_tasks)} tarefa(s) importada(s) com sucesso.")
+        self._show_toast(f"{len(newly_added_tasks)} tarefa(s) importada(s) com sucesso.")
+
+    def _show_toast(self, text: str, ms: int = 2500):
+        """Aviso não modal no rodapé da janela principal; some sozinho após `ms` milissegundos."""
+        toast = self._toast
+        if toast is None or not toast.winfo_exists():
+            toast = self._toast = ctk.CTkLabel(
+                self,
+                text="",
+                fg_color=THEME.color("badge_bg"),
+                text_color=THEME.color("badge_text"),
+                corner_radius=10,
+                padx=18,
+                pady=8,
+            )
+        if self._toast_job:
+            try: self.after_cancel(self._toast_job)
+            except Exception: pass
+        toast.configure(text=text)
+        # place() não interfere no pack da barra/grade e fica por cima do conteúdo
+        toast.place(relx=0.5, rely=1.0, y=-18, anchor="s")
+        toast.lift()
+        self._toast_job = self.after(ms, self._hide_toast)
+
+    def _hide_toast(self):
+        self._toast_job = None
+        if self._toast is not None:
+            try: self._toast.place_forget()
+            except Exception: pass
 
     # ===== Tabela de edição (grade principal) =====
     def _build_table_area(self):
@@ -2061,6 +2775,11 @@ class App(ctk.CTk):
         self.body_canvas.configure(xscrollcommand=lambda a,b: self.xscroll.set(a,b))
 
         self.rows_frame.bind("<Configure>", lambda e: self._resize_rows())
+        self.bind_class(self._ROW_TAG, "<Button-3>", self._on_row_context)
+        self.bind_class(self._RULE_TAG, "<Enter>", self._on_rule_enter)
+        self.bind_class(self._RULE_TAG, "<Leave>", self._on_rule_leave)
+        self.bind_class(self._RULE_TAG, "<Button-1>", self._on_rule_click)
+        self.bind_class(self._ENTRY_TAG, "<FocusOut>", self._on_row_entry_focus_out)
         self.body_canvas.bind("<Configure>", lambda e: self._on_body_viewport_resize())
 
         self._bind_mousewheel(self.body_canvas)
@@ -2096,11 +2815,40 @@ class App(ctk.CTk):
         current_task = self._get_task()
         current_task_id = current_task.id if current_task else None
         return {
-            "project": self.project.to_dict(),
+            "project": self._snapshot_project(),
             "current_task_id": current_task_id,
             "selected_field_ids": list(self.selected_field_ids),
         }
 
+    def _snapshot_project(self) -> dict:
+        """Igual a project.to_dict(), mas reaproveita o dict de cada campo que não mudou desde o quadro anterior.
+
+        Os quadros nunca são alterados depois de criados (from_dict cria objetos novos), então partilhá-los é seguro.
+        """
+        project = self.project
+        old_memo = self._undo_field_memo
+        memo: Dict[str, Tuple[tuple, dict]] = {}
+        tasks = []
+        for t in project.tasks:
+            field_dicts = []
+            for f in t.fields:
+                state = (_field_state(f), tuple([(c.src_field, c.op, c.value) for c in f.cond]))
+                hit = old_memo.get(f.id)
+                if hit is not None and hit[0] == state:
+                    fd = hit[1]
+                else:
+                    fd = _field_to_dict(f)
+                memo[f.id] = (state, fd)
+                field_dicts.append(fd)
+            tasks.append({"id": t.id, "name": t.name, "fields": field_dicts})
+        self._undo_field_memo = memo
+        return {
+            "flow_name": project.flow_name,
+            "object_type": project.object_type,
+            "object_schema": project.object_schema_dicts(),
+            "tasks": tasks,
+        }
+
     def _apply_project_dict(self, d: dict) -> bool:
         if not isinstance(d, dict):
             messagebox.showerror("Abrir projeto", "O arquivo selecionado não contém um projeto válido.")
@@ -2154,16 +2902,36 @@ class App(ctk.CTk):
 
         return True
 
+    def _schedule_commit(self, f: Field, attr: str, value: str):
+        """<FocusOut> de opções/observações: grava no próximo ciclo ocioso, num só quadro de undo por rajada."""
+        if getattr(f, attr) == value: return  # Tab sem edição não gera undo
+        self._pending_commits.append((f, attr, value))
+        if self._commit_job is None:
+            self._commit_job = self.after_idle(self._flush_pending_commits)
+
+    def _flush_pending_commits(self):
+        if self._commit_job is not None:
+            try: self.after_cancel(self._commit_job)
+            except Exception: pass
+            self._commit_job = None
+        pending, self._pending_commits = self._pending_commits, []
+        changes = [(f, attr, value) for f, attr, value in pending if getattr(f, attr) != value]
+        if not changes: return
+        self._push_undo()
+        for f, attr, value in changes:
+            setattr(f, attr, value)
+
     def _push_undo(self):
+        # Edições ainda na fila entram antes do novo quadro (senão o snapshot sairia sem elas)
+        if self._pending_commits: self._flush_pending_commits()
         try:
-            self._undo_stack.append(self._serialize_project())
-            if len(self._undo_stack) > self._UNDO_MAX:
-                self._undo_stack.pop(0)
+            self._undo_stack.append(self._serialize_project())  # deque(maxlen) descarta o quadro mais antigo
             self._redo_stack.clear()
         except Exception:
             pass
 
     def undo_action(self):
+        if self._pending_commits: self._flush_pending_commits()
         if not self._undo_stack:
             return
         try:
@@ -2174,6 +2942,7 @@ class App(ctk.CTk):
             messagebox.showerror("Undo", f"Falha ao desfazer.\n\n{e}")
 
     def redo_action(self):
+        if self._pending_commits: self._flush_pending_commits()
         if not self._redo_stack:
             return
         try:
@@ -2186,6 +2955,7 @@ class App(ctk.CTk):
     # ===== Persistência de Edição =====
     def _commit_active_edits(self):
         """Salva explicitamente o conteúdo do widget focado no modelo de dados."""
+        if self._pending_commits: self._flush_pending_commits()
         try:
             focused_widget = self.focus_get()
             allowed_widgets: Tuple[type, ...] = (ctk.CTkEntry,)
@@ -2196,95 +2966,63 @@ class App(ctk.CTk):
             if focused_widget is None or not isinstance(focused_widget, allowed_widgets):
                 return
 
-            parent = focused_widget.master
-            while parent is not None and not hasattr(parent, '_grid_info'):
-                if parent in self._rows:
-                    break
-                parent = parent.master
-
-            if parent in self._rows:
-                row_idx = self._rows.index(parent)
-                task = self._get_task()
-                if task and row_idx < len(task.fields):
-                    field = task.fields[row_idx]
-
-                    undo_triggered = False
+            # As entradas da grade carregam o Field da linha (ver _register_row_input)
+            field = getattr(focused_widget, "_designer_field", None)
+            if field is not None:
+                undo_triggered = False
 
-                    def ensure_once():
-                        nonlocal undo_triggered
-                        if not undo_triggered:
-                            self._push_undo()
-                            undo_triggered = True
+                def ensure_once():
+                    nonlocal undo_triggered
+                    if not undo_triggered:
+                        self._push_undo()
+                        undo_triggered = True
 
-                    self._commit_row_data(field, ensure_undo=ensure_once)
+                self._commit_row_data(field, ensure_undo=ensure_once)
         except Exception:
             pass
 
     def _commit_row_data(self, field_obj: Field, *, ensure_undo: Optional[Callable[[], None]] = None) -> bool:
         """Salva os dados dos widgets de entrada de uma linha diretamente no objeto Field."""
         changed = False
-        need_rebuild = False
         try:
-            task = self._get_task()
-            if not task:
-                return False
-
-            row_idx = -1
-            for i, f in enumerate(task.fields):
-                if f.id == field_obj.id:
-                    row_idx = i
-                    break
-
-            if row_idx == -1 or row_idx not in self._row_cells:
+            inputs = self._row_inputs.get(field_obj.id)
+            if not inputs:
                 return False
 
-            row_widgets = self._row_cells[row_idx]
-
-            if 'campo' in row_widgets and not field_obj.name_locked:
-                children = row_widgets['campo'].winfo_children()
-                if children:
-                    widget = children[0]
-                    if isinstance(widget, (ctk.CTkEntry, tk.Entry)):
-                        new_name = widget.get()
-                        if new_name != field_obj.name:
-                            if ensure_undo:
-                                ensure_undo()
-                            field_obj.name = new_name
-                            need_rebuild = True
-                            changed = True
-                            for task_iter in self.project.tasks:
-                                for fld in task_iter.fields:
-                                    if fld.origin_field == field_obj.id and fld.name_lock_reason == "origem":
-                                        fld.name = new_name
-
-            if 'opts' in row_widgets:
-                children = row_widgets['opts'].winfo_children()
-                if children:
-                    widget = children[0]
-                    if isinstance(widget, (ctk.CTkEntry, tk.Entry)):
-                        current_opts = field_obj.options or ""
-                        new_opts = widget.get()
-                        if new_opts != current_opts:
-                            if ensure_undo:
-                                ensure_undo()
-                            field_obj.options = new_opts
-                            changed = True
-
-            if 'obs' in row_widgets:
-                children = row_widgets['obs'].winfo_children()
-                if children:
-                    widget = children[0]
-                    if isinstance(widget, (ctk.CTkEntry, tk.Entry)):
-                        current_note = field_obj.note or ""
-                        new_note = widget.get()
-                        if new_note != current_note:
-                            if ensure_undo:
-                                ensure_undo()
-                            field_obj.note = new_note
-                            changed = True
-
-            if need_rebuild:
-                self._rebuild_metadata_cache()
+            widget = inputs.get('campo')
+            if widget is not None and not field_obj.name_locked:
+                new_name = widget.get()
+                if new_name != field_obj.name:
+                    if ensure_undo:
+                        ensure_undo()
+                    field_obj.name = new_name
+                    self._rename_field_in_cache(field_obj)
+                    changed = True
+                    for task_iter in self.project.tasks:
+                        for fld in task_iter.fields:
+                            if fld.origin_field == field_obj.id and fld.name_lock_reason == "origem":
+                                fld.name = new_name
+                                self._rename_field_in_cache(fld)
+
+            widget = inputs.get('opts')
+            if widget is not None:
+                current_opts = field_obj.options or ""
+                new_opts = widget.get()
+                if new_opts != current_opts:
+                    if ensure_undo:
+                        ensure_undo()
+                    field_obj.options = new_opts
+                    changed = True
+
+            widget = inputs.get('obs')
+            if widget is not None:
+                current_note = field_obj.note or ""
+                new_note = widget.get()
+                if new_note != current_note:
+                    if ensure_undo:
+                        ensure_undo()
+                    field_obj.note = new_note
+                    changed = True
         except Exception:
             return changed
 
@@ -2305,27 +3043,49 @@ class App(ctk.CTk):
                     self._push_undo()
                     undo_triggered = True
 
+            # Só as linhas com entradas construídas podem ter texto pendente
+            row_inputs = self._row_inputs
             for field in task.fields:
-                self._commit_row_data(field, ensure_undo=ensure_once)
+                if field.id in row_inputs:
+                    self._commit_row_data(field, ensure_undo=ensure_once)
         except Exception:
             pass
 
     # ===== Persistência de layout =====
+    @staticmethod
+    def _config_sig() -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(CONFIG_PATH)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
     def _load_json(self) -> dict:
+        # Devolve uma cópia rasa: quem chama (ex.: _save_cols_config) altera o dict antes de salvar
+        sig = self._config_sig()
+        if sig is None:
+            return {}
+        if self._json_cache is not None and sig == self._json_sig:
+            return dict(self._json_cache)
         try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                    return json.load(f)
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                data = _json_loads(f.read())
         except Exception:
-            pass
-        return {}
+            return {}
+        if isinstance(data, dict):
+            self._json_cache, self._json_sig = data, sig
+            return dict(data)
+        return data
 
     def _save_json(self, data: dict):
         try:
             with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.write(_json_dumps(data))
         except Exception as e:
+            self._json_cache = self._json_sig = None
             messagebox.showerror("Salvar configuração", f"Falha ao salvar config.\n\n{e}")
+            return
+        self._json_cache, self._json_sig = dict(data), self._config_sig()
 
     def _load_cols_config(self) -> List[Tuple[str, str, int]]:
         data = self._load_json(); widths: Dict[str, int] = data.get("col_widths", {}) if isinstance(data, dict) else {}
@@ -2337,47 +3097,101 @@ class App(ctk.CTk):
         return out
 
     def _save_cols_config(self):
+        if self._cols_save_job is not None:
+            self.after_cancel(self._cols_save_job); self._cols_save_job = None
         data = self._load_json()
         widths = {k: int(w) for (k, _, w) in self.cols}
         data["col_widths"] = widths; data["col_gap"] = int(self.col_gap)
         self._save_json(data)
 
+    _COLS_SAVE_DELAY_MS = 400  # espera após o último ajuste de coluna antes de gravar a config
+
+    def _schedule_cols_save(self):
+        # Grava fora do tratamento do clique/soltar; mudanças seguidas viram uma só escrita
+        if self._cols_save_job is not None:
+            self.after_cancel(self._cols_save_job)
+        self._cols_save_job = self.after(self._COLS_SAVE_DELAY_MS, self._save_cols_config)
+
+    def destroy(self):
+        # Não perde larguras ainda pendentes de gravação ao fechar
+        if getattr(self, "_cols_save_job", None) is not None:
+            try: self._save_cols_config()
+            except Exception: pass
+        super().destroy()
+
     def _load_col_gap_config(self, default: int) -> int:
         data = self._load_json()
         try: return int(data.get("col_gap", default))
         except Exception: return default
 
     # ===== Geometria/scroll =====
-    def _col_positions(self, cols_override: Optional[List[Tuple[str, str, int]]] = None) -> List[Tuple[str, int, int]]:
-        cols = cols_override or self.cols
+    def _cols_changed(self):
+        self._cols_version += 1
+        self._label_by_key = {k: label for k, label, _ in self.cols}
+        self._col_width_by_key = {k: int(w) for k, _, w in self.cols}
+
+    def _compute_col_positions(self, cols: List[Tuple[str, str, int]]) -> ColPositions:
         x = 0; gap = int(self.col_gap); out = []
         for key, _, w in cols:
             w = max(MIN_W.get(key, 60), int(w))
             out.append((key, x, w))
             x += w + gap
-        return out
+        return tuple(out)
+
+    def _current_cols_geometry(self) -> Tuple[ColPositions, int]:
+        cached = self._cols_geometry
+        if cached is not None and cached[0] == self._cols_version:
+            return cached[1], cached[2]
+        positions = self._compute_col_positions(self.cols)
+        total_w = positions[-1][1] + positions[-1][2] if positions else 0
+        self._cols_geometry = (self._cols_version, positions, total_w)
+        return positions, total_w
+
+    def _positions_by_key(self, positions: ColPositions) -> Dict[str, Tuple[int, int]]:
+        cached = self._pos_index
+        if cached is not None and cached[0] is positions:
+            return cached[1]
+        index = {key: (x, w) for key, x, w in positions}
+        self._pos_index = (positions, index)
+        return index
+
+    def _col_positions(self, cols_override: Optional[List[Tuple[str, str, int]]] = None) -> ColPositions:
+        # Prévia de arraste (cols_override) é sempre calculada; o resultado memorizado não deve ser alterado
+        if cols_override:
+            return self._compute_col_positions(cols_override)
+        return self._current_cols_geometry()[0]
 
     def _total_table_width(self, cols_override: Optional[List[Tuple[str, str, int]]] = None) -> int:
-        cols = cols_override or self.cols
-        gap = int(self.col_gap)
-        return sum(max(MIN_W.get(k, 60), int(w)) for k, _, w in cols) + max(0, len(cols)-1)*gap
+        if cols_override:
+            cols = cols_override
+            gap = int(self.col_gap)
+            return sum(max(MIN_W.get(k, 60), int(w)) for k, _, w in cols) + max(0, len(cols)-1)*gap
+        return self._current_cols_geometry()[1]
 
     def _on_body_viewport_resize(self, event=None):
-        # DEBOUNCE: Aguarda 20ms para evitar processamento excessivo durante arraste
+        # DEBOUNCE (borda final): só faz o layout 120ms depois do último <Configure> do arraste
         if self._resize_timer:
             self.after_cancel(self._resize_timer)
-        self._resize_timer = self.after(20, self._perform_resize_layout)
+        self._resize_timer = self.after(120, self._perform_resize_layout)
 
     def _perform_resize_layout(self):
-        self._resize_rows()
-        self._resize_header()
-        # rebuild_resizers=False evita recriar widgets desnecessariamente durante resize
-        self._apply_positions(self._col_positions(), rebuild_resizers=False)
         self._resize_timer = None
-
-    def _resize_header(self):
-        total_w = self._total_table_width()
-        viewport_w = max(1, self.body_canvas.winfo_width())
+        # Nada a fazer se a viewport e a largura da tabela são as mesmas do último layout
+        layout_key = (self.body_canvas.winfo_width(), self.body_canvas.winfo_height(), self._total_table_width())
+        if layout_key == self._last_resize_layout:
+            return
+        # rebuild_resizers=False evita recriar widgets desnecessariamente durante resize;
+        # _apply_positions já ajusta linhas e cabeçalho com as medidas lidas aqui
+        self._apply_positions(self._col_positions(), rebuild_resizers=False,
+                              sizes=(layout_key[2], max(1, layout_key[0])))
+        self._last_resize_layout = layout_key
+
+    def _resize_header(self, total_w: Optional[int] = None, viewport_w: Optional[int] = None):
+        if total_w is None: total_w = self._total_table_width()
+        if viewport_w is None: viewport_w = max(1, self.body_canvas.winfo_width())
+        # Nada mudou desde o último ajuste: evita os cget/itemcget abaixo
+        header_key = (total_w, viewport_w, self.header_h)
+        if header_key == self._last_header_layout: return
         inner_w = max(total_w, viewport_w)
 
         # GUARDA CONDICIONAL: Só aplica configure se o scrollregion mudou
@@ -2397,14 +3211,18 @@ class App(ctk.CTk):
         # Sincroniza largura da viewport
         if int(self.header_canvas.cget("width")) != int(viewport_w):
             self.header_canvas.configure(width=viewport_w)
+        self._last_header_layout = header_key
 
-    def _resize_rows(self):
-        total_w = self._total_table_width()
-        viewport_w = max(1, self.body_canvas.winfo_width())
+    def _resize_rows(self, total_w: Optional[int] = None, viewport_w: Optional[int] = None):
+        if total_w is None: total_w = self._total_table_width()
+        if viewport_w is None: viewport_w = max(1, self.body_canvas.winfo_width())
         inner_w = max(total_w, viewport_w)
 
         bbox = self.body_canvas.bbox(self.body_window)
         height = max(bbox[3] if bbox else 0, self.body_canvas.winfo_height())
+        # Nada mudou desde o último ajuste (caso comum no scroll vertical): evita cget/itemcget
+        rows_key = (total_w, viewport_w, height)
+        if rows_key == self._last_rows_layout: return
 
         # GUARDA CONDICIONAL: Impede loop de eventos no scrollregion
         new_region = (0, 0, total_w, height)
@@ -2418,21 +3236,45 @@ class App(ctk.CTk):
         current_inner_w = float(self.body_canvas.itemcget(self.body_window, "width"))
         if abs(current_inner_w - inner_w) > 1:
             self.body_canvas.itemconfig(self.body_window, width=inner_w)
+        self._last_rows_layout = rows_key
 
     def _bind_mousewheel(self, widget: tk.Widget):
-        widget.bind_all("<MouseWheel>", lambda e: self._on_mousewheel(e), add="+")
-        widget.bind_all("<Shift-MouseWheel>", lambda e: self._on_hwheel(e), add="+")
+        # Um único binding global por evento; _wheel_in_main_window decide se a roda é da grade
+        widget.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        widget.bind_all("<Shift-MouseWheel>", self._on_hwheel, add="+")
         # Linux
-        widget.bind_all("<Button-4>", lambda e: self._on_mousewheel(e), add="+")
-        widget.bind_all("<Button-5>", lambda e: self._on_mousewheel(e), add="+")
-        widget.bind_all("<Shift-Button-4>", lambda e: self._on_hwheel(e), add="+")
-        widget.bind_all("<Shift-Button-5>", lambda e: self._on_hwheel(e), add="+")
+        widget.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        widget.bind_all("<Button-5>", self._on_mousewheel, add="+")
+        widget.bind_all("<Shift-Button-4>", self._on_hwheel, add="+")
+        widget.bind_all("<Shift-Button-5>", self._on_hwheel, add="+")
+    def _wheel_in_main_window(self, e) -> bool:
+        """True se o ponteiro está sobre a janela principal (e não sobre o importador, diálogos etc.)."""
+        try:
+            w = self.winfo_containing(e.x_root, e.y_root)
+            return w is not None and w.winfo_toplevel() is self
+        except Exception:
+            return False
+    # Eventos de roda são acumulados e aplicados num único *view_scroll por quadro (~16ms)
     def _on_mousewheel(self, e):
-        delta = -1 if getattr(e, "delta", 0) > 0 or getattr(e, "num", None) == 4 else 1
-        self.body_canvas.yview_scroll(delta, "units")
+        if not self._wheel_in_main_window(e): return
+        self._wheel_accum_y += -1 if getattr(e, "delta", 0) > 0 or getattr(e, "num", None) == 4 else 1
+        self._schedule_wheel_flush()
     def _on_hwheel(self, e):
-        self.header_canvas.xview_scroll(-1 if getattr(e, "delta", 0) > 0 else 1, "units")
-        self.body_canvas.xview_scroll(-1 if getattr(e, "delta", 0) > 0 else 1, "units")
+        if not self._wheel_in_main_window(e): return
+        self._wheel_accum_x += -1 if getattr(e, "delta", 0) > 0 or getattr(e, "num", None) == 4 else 1
+        self._schedule_wheel_flush()
+    def _schedule_wheel_flush(self):
+        if self._wheel_after is None:
+            self._wheel_after = self.after(16, self._flush_wheel)
+    def _flush_wheel(self):
+        self._wheel_after = None
+        dy, dx = self._wheel_accum_y, self._wheel_accum_x
+        self._wheel_accum_y = self._wheel_accum_x = 0
+        if dy:
+            self.body_canvas.yview_scroll(dy, "units")
+        if dx:
+            self.header_canvas.xview_scroll(dx, "units")
+            self.body_canvas.xview_scroll(dx, "units")
 
     # ===== Header =====
     def _build_header(self, initial: bool = False):
@@ -2447,12 +3289,12 @@ class App(ctk.CTk):
                 else:
                     lbl.pack(fill="both", expand=True)
                 self._header_cells[key] = cell
-        self._apply_positions(self._col_positions(), rebuild_resizers=True)
+            # As células acabaram de ser criadas com place(x=) escalado: força o _place_cells
+            self._applied_positions = None
+        self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True)
 
     def _label_of(self, key: str) -> str:
-        for k, label, _ in self.cols:
-            if k == key: return label
-        return key
+        return self._label_by_key.get(key, key)
 
     def _clear_resizers(self):
         if hasattr(self, "_resizers"):
@@ -2460,7 +3302,18 @@ class App(ctk.CTk):
                 if r and str(r): r.destroy()
             self._resizers.clear()
 
-    def _build_resizers(self, positions: List[Tuple[str, int, int]]):
+    def _build_resizers(self, positions: ColPositions):
+        if self._resizers and positions == self._resizer_positions:
+            return
+        self._resizer_positions = positions
+        # Mesma quantidade de divisores (e binds por índice): só reposiciona os existentes
+        if self._resizers and len(self._resizers) == len(positions) - 1:
+            try:
+                for rz, (_, x, w) in zip(self._resizers, positions):
+                    rz.place_configure(x=x + w - 4, y=0)
+                return
+            except tk.TclError:
+                pass
         self._clear_resizers()
         for i in range(len(positions) - 1):
             _, x, w = positions[i]; boundary_x = x + w
@@ -2473,20 +3326,62 @@ class App(ctk.CTk):
             rz.bind("<Double-Button-1>",lambda e, idx=i: self._on_resizer_autofit(idx))
             self._resizers.append(rz)
 
-    def _apply_positions(self, positions: List[Tuple[str, int, int]], rebuild_resizers: bool):
+    def _apply_positions(self, positions: ColPositions, rebuild_resizers: bool, restore_xview_idle: bool = False,
+                         sizes: Optional[Tuple[int, int]] = None):
+        # restore_xview_idle=True só em ações pontuais (soltar o divisor, diálogos, reconstrução das
+        # linhas): reaplica o xview via after_idle, depois que a geometria assentar. Não há flush
+        # síncrono (update_idletasks); o scrollregion é reajustado pelo <Configure> do rows_frame.
         x0 = self.body_canvas.xview()[0] if self.body_canvas.winfo_ismapped() else 0.0
-        for key, x, w in positions:
-            cell = self._header_cells.get(key)
-            if cell and str(cell): cell.place_configure(x=x, y=0, width=w, height=self.header_h)
-        xw = {k: (x, w) for (k, x, w) in positions}
-        for _, cells_map in self._row_cells.items():
-            for key, cell in cells_map.items():
-                if key in xw and str(cell):
-                    x, w = xw[key]; cell.place_configure(x=x, y=0, width=w, height=self.row_h)
+        # Células já posicionadas com estas mesmas colunas (ex.: linha nova, resize da janela): nada a mover
+        if positions != self._applied_positions:
+            self._place_cells(positions)
+            self._applied_positions = positions
         if rebuild_resizers: self._build_resizers(positions)
-        self._resize_rows(); self._resize_header()
-        self.update_idletasks()
+        # (largura da tabela, largura da viewport) medidas uma vez por passada de layout
+        total_w, viewport_w = sizes or (self._total_table_width(), max(1, self.body_canvas.winfo_width()))
+        self._resize_rows(total_w, viewport_w); self._resize_header(total_w, viewport_w)
         self.header_canvas.xview_moveto(x0); self.body_canvas.xview_moveto(x0)
+        if restore_xview_idle:
+            if self._xview_job is not None:
+                self.after_cancel(self._xview_job)
+            self._xview_job = self.after_idle(self._restore_xview, x0)
+
+    def _restore_xview(self, x0: float):
+        self._xview_job = None
+        self.header_canvas.xview_moveto(x0); self.body_canvas.xview_moveto(x0)
+
+    def _apply_positions_partial(self, positions: ColPositions, from_idx: int):
+        """Reposiciona só as células das colunas a partir de from_idx (prévia do arraste de um divisor)."""
+        self._applied_positions = None
+        self._place_cells(positions[from_idx:])
+
+    def _place_cells(self, positions: ColPositions, rows: Optional[List[Dict[str, ctk.CTkFrame]]] = None):
+        """Aplica x/largura às células de cabeçalho e linhas das colunas indicadas num único script Tcl.
+
+        Equivale a place_configure célula a célula (que já ignora a escala do CTk), mas cruza a
+        fronteira Python/Tcl uma só vez. Se alguma célula já foi destruída, refaz uma a uma.
+        Com `rows`, posiciona só essas linhas (sem o cabeçalho).
+        """
+        header_h, row_h = self.header_h, self.row_h
+        placements: List[Tuple[tk.Misc, int, int, int]] = []
+        if rows is None:
+            rows = self._row_cells
+            for key, x, w in positions:
+                cell = self._header_cells.get(key)
+                if cell is not None: placements.append((cell, x, w, header_h))
+        for cells_map in rows:
+            for key, x, w in positions:
+                cell = cells_map.get(key)
+                if cell is not None: placements.append((cell, x, w, row_h))
+        if not placements:
+            return
+        script = "\n".join(f"place configure {cell._w} -x {x} -y 0 -width {w} -height {h}" for cell, x, w, h in placements)
+        try:
+            self.tk.eval(script)
+        except tk.TclError:
+            for cell, x, w, h in placements:
+                try: cell.place_configure(x=x, y=0, width=w, height=h)
+                except tk.TclError: pass
 
     def _on_resizer_press(self, e, idx: int):
         pos = self._col_positions(); _, x, w = pos[idx]
@@ -2505,23 +3400,24 @@ class App(ctk.CTk):
         temp_pos = self._col_positions(temp_cols)
         new_boundary = temp_pos[idx][1] + temp_cols[idx][2]
         if self._resizer_guide and str(self._resizer_guide): self._resizer_guide.place(x=new_boundary, y=0)
-        self._apply_positions(temp_pos, rebuild_resizers=False)
+        # Só a coluna arrastada e as da direita mudam; scrollregion e divisores são refeitos ao soltar
+        self._apply_positions_partial(temp_pos, idx)
 
     def _on_resizer_release(self, e, idx: int):
         if not self._resizer_state or self._resizer_state.get("idx") != idx: return
         dx = e.x_root - self._resizer_state["x0"]
         key, label, start_w = self.cols[idx]
         new_w = max(MIN_W.get(key, 60), start_w + dx)
-        self.cols[idx] = (key, label, int(new_w))
+        self.cols[idx] = (key, label, int(new_w)); self._cols_changed()
         self._resizer_state = None
         if self._resizer_guide and str(self._resizer_guide): self._resizer_guide.destroy(); self._resizer_guide = None
-        self._apply_positions(self._col_positions(), rebuild_resizers=True); self._save_cols_config()
+        self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True); self._schedule_cols_save()
 
     def _on_resizer_autofit(self, idx: int):
         key, label, _ = self.cols[idx]
         est = max(MIN_W.get(key, 60), int(len(label) * 7 + 32))
-        self.cols[idx] = (key, label, est)
-        self._apply_positions(self._col_positions(), rebuild_resizers=True); self._save_cols_config()
+        self.cols[idx] = (key, label, est); self._cols_changed()
+        self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True); self._schedule_cols_save()
 
     # ===== Layout dialogs =====
     def open_columns_dialog(self):
@@ -2537,11 +3433,9 @@ class App(ctk.CTk):
             e = ctk.CTkEntry(row, width=120); e.insert(0, str(width)); e.pack(side="left", padx=8)
             entries[key] = e
         btns = ctk.CTkFrame(win, fg_color="transparent"); btns.pack(fill="x", padx=12, pady=(0, 12))
-        import re as _re
         def parse_int(s: str, default: int = 100) -> int:
-            m = _re.findall(r"\d+", s or "")
-            try: v = int("".join(m)) if m else default; return max(40, v)
-            except Exception: return default
+            digits = "".join(c for c in (s or "") if c.isdecimal())
+            return max(40, int(digits)) if digits else default
         def aplicar():
             self._push_undo()
             new_cols = list(self.cols)
@@ -2550,9 +3444,9 @@ class App(ctk.CTk):
                 except Exception: v = 100
                 for idx, (k, label, w) in enumerate(new_cols):
                     if k == key: new_cols[idx] = (k, label, v); break
-            self.cols = new_cols
-            self._apply_positions(self._col_positions(), rebuild_resizers=True)
-            self._save_cols_config()
+            self.cols = new_cols; self._cols_changed()
+            self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True)
+            self._schedule_cols_save()
         ctk.CTkButton(btns, text="Aplicar", width=110, command=aplicar).pack(side="right")
         ctk.CTkButton(btns, text="Fechar", width=110, command=win.destroy).pack(side="right", padx=6)
 
@@ -2563,14 +3457,13 @@ class App(ctk.CTk):
 
         ctk.CTkLabel(win, text="Gap (px) entre colunas:").pack(pady=(14, 6))
         e = ctk.CTkEntry(win, width=120); e.pack(); e.insert(0, str(int(self.col_gap)))
-        import re as _re
         def ok():
             self._push_undo()
-            s = e.get().strip(); m = _re.findall(r"\d+", s)
-            if not m: return
-            self.col_gap = max(0, int("".join(m)))
-            self._apply_positions(self._col_positions(), rebuild_resizers=True)
-            self._save_cols_config()
+            digits = "".join(c for c in e.get() if c.isdecimal())
+            if not digits: return
+            self.col_gap = max(0, int(digits)); self._cols_changed()
+            self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True)
+            self._schedule_cols_save()
             win.destroy()
         ctk.CTkButton(win, text="OK", command=ok).pack(pady=10)
 
@@ -2582,11 +3475,24 @@ class App(ctk.CTk):
         except Exception:
             self.tk_scale = 1.0
         self.col_gap = max(5, int(round(5 * self.tk_scale)))
-        self._apply_positions(self._col_positions(), rebuild_resizers=True)
-        self._save_cols_config()
+        self._cols_changed()
+        self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True)
+        self._schedule_cols_save()
         messagebox.showinfo("Layout", "Larguras e espaçamento restaurados.")
 
     # ===== Gerenciador de Tarefas =====
+    def _schedule_ui_refresh(self):
+        if self._ui_refresh_job is None:
+            self._ui_refresh_job = self.after_idle(self._flush_ui_refresh)
+
+    def _flush_ui_refresh(self):
+        self._ui_refresh_job = None
+        self._refresh_task_combo()
+        self._refresh_rows()
+        if self.sim_window and self.sim_window.winfo_exists():
+            try: self.sim_window.on_model_changed()
+            except Exception: pass
+
     def open_tasks_dialog(self):
         win = ctk.CTkToplevel(self)
         win.title("Tarefas do fluxo")
@@ -2618,12 +3524,9 @@ class App(ctk.CTk):
         ctk.CTkButton(bottom_frame, text="Fechar", width=120, command=win.destroy).pack(side="right")
 
         def refresh_all_ui():
-            self._rebuild_metadata_cache()
-            self._refresh_task_combo()
-            self._refresh_rows()
-            if self.sim_window and self.sim_window.winfo_exists():
-                try: self.sim_window.on_model_changed()
-                except Exception: pass
+            # O cache de metadados é atualizado pontualmente por cada ação antes de chamar esta função;
+            # cliques seguidos (▲/▼, renomear, excluir) geram uma só atualização da janela principal
+            self._schedule_ui_refresh()
 
         def cleanup_refs(deleted_field_ids: Set[str]):
             if not deleted_field_ids: return
@@ -2635,6 +3538,7 @@ class App(ctk.CTk):
                         f.origin_task = None; f.origin_field = None
                         f.name_lock_reason = "" if f.name_lock_reason == "origem" else f.name_lock_reason
                         f.name_locked = (f.name_lock_reason != "")
+                        self._rename_field_in_cache(f)
 
         def add_task_from_entry(close_after: bool):
             name = entry_new_task.get().strip()
@@ -2645,6 +3549,7 @@ class App(ctk.CTk):
             self._push_undo()
             t = Task(id=_uid(), name=name, fields=[])
             self.project.tasks.append(t)
+            self._add_task_to_cache(t)
             if not self.current_task_id:
                 self.current_task_id = t.id
             
@@ -2666,6 +3571,7 @@ class App(ctk.CTk):
             if new is not None:
                 self._push_undo()
                 t.name = new
+                self._task_id_to_name[t.id] = new
                 render(); refresh_all_ui()
 
         def delete_task(t: Task):
@@ -2675,6 +3581,7 @@ class App(ctk.CTk):
             deleted_ids = {f.id for f in t.fields}
             cleanup_refs(deleted_ids)
             self.project.tasks = [x for x in self.project.tasks if x.id != t.id]
+            self._remove_task_from_cache(t)
             if self.current_task_id == t.id:
                 self.current_task_id = self.project.tasks[0].id if self.project.tasks else None
             render(); refresh_all_ui()
@@ -2730,6 +3637,7 @@ class App(ctk.CTk):
         task = self._get_task()
         if not task:
             return
+        self._flush_pending_rows()
 
         fields = task.fields
         idx = next((i for i, f in enumerate(fields) if f.id == field_id), -1)
@@ -2744,207 +3652,244 @@ class App(ctk.CTk):
             # 1. Move no modelo de dados
             fields[idx], fields[new_idx] = fields[new_idx], fields[idx]
 
-            # 2. Move o widget da linha na lista de widgets da UI
-            row_widget = self._rows.pop(idx)
-            self._rows.insert(new_idx, row_widget)
-
-            # 3. Re-empacota os widgets na nova ordem (muito mais rápido que destruir e recriar)
-            for w in self._rows:
-                w.pack_forget()
-            for w in self._rows:
-                w.pack(fill="x", pady=0)
+            if abs(delta) == 1 and new_idx < len(self._rows):
+                # 2. Troca só as duas linhas vizinhas: listas, mapa de células e ordem no pack
+                rows = self._rows
+                rows[idx], rows[new_idx] = rows[new_idx], rows[idx]
+                cells = self._row_cells
+                cells[idx], cells[new_idx] = cells[new_idx], cells[idx]
+                lo, hi = min(idx, new_idx), max(idx, new_idx)
+                rows[lo].pack(before=rows[hi])
+            else:
+                # 2. Move o widget da linha na lista de widgets da UI
+                row_widget = self._rows.pop(idx)
+                self._rows.insert(new_idx, row_widget)
 
-            # 4. Reconstrói o mapeamento de células de forma segura
-            temp_cells = list(self._row_cells.values())
-            moved_cell_dict = temp_cells.pop(idx)
-            temp_cells.insert(new_idx, moved_cell_dict)
-            self._row_cells = {i: d for i, d in enumerate(temp_cells)}
+                # 3. Re-empacota os widgets na nova ordem (muito mais rápido que destruir e recriar)
+                for w in self._rows:
+                    w.pack_forget()
+                for w in self._rows:
+                    w.pack(fill="x", pady=0)
 
-            # O rebuild do cache não é estritamente necessário aqui, mas não custa.
-            self._rebuild_metadata_cache()
+                # 4. Mantém as células paralelas a _rows
+                self._row_cells.insert(new_idx, self._row_cells.pop(idx))
+            # Reordenar não altera nomes nem donos dos campos: o cache de metadados continua válido
 
 
     # ===== Edição de linhas =====
+    _ROW_BATCH = 30  # linhas construídas por passo depois do primeiro ecrã
+
     def _refresh_rows(self):
-        for w in self.rows_frame.winfo_children(): w.destroy()
-        self._rows.clear(); self._row_cells.clear(); self._field_row_map.clear()
-        if not self.project.tasks:
-            self._resize_rows(); self._resize_header(); return
-        t = self._get_task()
-        if not t: return
-        
+        self._cancel_row_build()
+        self._applied_positions = None
+        # rows_frame é uma janela do body_canvas (não está empacotado): fica escondida durante a troca
+        # das linhas e só reaparece no idle (_reveal_rows), depois do primeiro ecrã, do arranjo do pack e
+        # do _apply_positions; assim o Tk não chega a mapear/redesenhar os passos intermédios
+        self.body_canvas.itemconfigure(self.body_window, state="hidden")
+        try:
+            for w in self.rows_frame.winfo_children(): w.destroy()
+            self._rows.clear(); self._row_cells.clear(); self._field_row_map.clear(); self._row_inputs.clear(); self._row_widgets.clear()
+            t = self._get_task() if self.project.tasks else None
+            if t:
+                positions = self._col_positions()
+                # Só o que cabe na área visível (+ folga) é construído já; o resto segue em lotes via after()
+                first_screen = max(1, self.body_canvas.winfo_height() // max(1, self.row_h)) + 6
+                for idx, f in enumerate(t.fields[:first_screen]):
+                    self._add_row_widget(idx, f, t, positions)
+                if len(t.fields) > first_screen:
+                    self._row_build = (t, first_screen)
+                    self._row_build_job = self.after(1, lambda: self._build_more_rows(limit=self._ROW_BATCH))
+
+            if not self.project.tasks:
+                total_w, viewport_w = self._total_table_width(), max(1, self.body_canvas.winfo_width())
+                self._resize_rows(total_w, viewport_w); self._resize_header(total_w, viewport_w); return
+            if not t: return
+
+            self._apply_positions(self._col_positions(), rebuild_resizers=True, restore_xview_idle=True)
+        finally:
+            if self._rows_reveal_job is not None:
+                self.after_cancel(self._rows_reveal_job)
+            self._rows_reveal_job = self.after_idle(self._reveal_rows)
+
+    def _reveal_rows(self):
+        self._rows_reveal_job = None
+        self.body_canvas.itemconfigure(self.body_window, state="normal")
+        # Escondida, a janela fica fora do bbox: refaz o scrollregion com a altura real das linhas
+        self._resize_rows()
+
+    def _build_more_rows(self, *, limit: Optional[int] = None):
+        self._row_build_job = None
+        if self._row_build is None:
+            return
+        t, start = self._row_build
+        if t is not self._get_task() or start != len(self._rows):
+            # A tarefa ou as linhas mudaram por outro caminho: a próxima _refresh_rows recomeça do zero
+            self._row_build = None
+            return
+        end = len(t.fields) if limit is None else min(len(t.fields), start + limit)
         positions = self._col_positions()
+        for idx in range(start, end):
+            self._add_row_widget(idx, t.fields[idx], t, positions)
+        self._place_cells(positions, self._row_cells[start:end])
+        if end < len(t.fields):
+            self._row_build = (t, end)
+            self._row_build_job = self.after(1, lambda: self._build_more_rows(limit=self._ROW_BATCH))
+        else:
+            self._row_build = None
 
-        for idx, f in enumerate(t.fields):
-            self._add_row_widget(idx, f, t, positions)
+    def _flush_pending_rows(self):
+        """Constrói já as linhas que ainda estão na fila (antes de operações que dependem do índice das linhas)."""
+        if self._row_build is None:
+            return
+        if self._row_build_job:
+            try: self.after_cancel(self._row_build_job)
+            except Exception: pass
+        self._build_more_rows()
 
-        self._apply_positions(self._col_positions(), rebuild_resizers=True)
+    def _cancel_row_build(self):
+        if self._row_build_job:
+            try: self.after_cancel(self._row_build_job)
+            except Exception: pass
+        self._row_build_job = None
+        self._row_build = None
 
     def _update_single_row_widgets(self, f: Field):
         """Otimizado: Atualiza valores simples e RECRIANDO widgets complexos se necessário."""
-        row = self._field_row_map.get(f.id)
-        if not row or row not in self._rows: return
-        idx = self._rows.index(row)
-        widgets = self._row_cells.get(idx, {})
+        # Referências diretas gravadas por _add_row_widget (sem varrer winfo_children nem isinstance)
+        widgets = self._row_widgets.get(f.id)
+        if not widgets: return
+        focused = self.focus_get()
+
+        def has_focus(entry) -> bool:
+            return focused is not None and (focused is entry or focused is getattr(entry, "_entry", None))
 
         # 1. Atualiza Cores e Textos Simples (Sem custo)
         bg_color = "#171a1f" if (f.origin_task and f.origin_field) else "transparent"
-        try: row.configure(fg_color=bg_color)
+        try: widgets["row"].configure(fg_color=bg_color)
         except: pass
 
-        if "origem" in widgets:
-            for child in widgets["origem"].winfo_children():
-                if isinstance(child, ctk.CTkButton):
-                    origem_label = self._origin_summary(f)
-                    if f.origin_task and f.origin_field: origem_label = "🔗 " + origem_label
-                    child.configure(text=origem_label)
-
-        if "regras" in widgets:
-            summary = self._cond_summary(f)
-            for frame in widgets["regras"].winfo_children():
-                if isinstance(frame, ctk.CTkFrame):
-                    for lbl in frame.winfo_children():
-                        if isinstance(lbl, ctk.CTkLabel):
-                            lbl.configure(text=summary)
+        origem_label = self._origin_summary(f)
+        if f.origin_task and f.origin_field: origem_label = "🔗 " + origem_label
+        widgets["origem"].configure(text=origem_label)
+        widgets["regras"].configure(text=self._cond_summary(f))
 
         # 2. Atualiza Checkboxes
-        for key, attr in [("obrig", "required"), ("soleit", "readonly")]:
-            if key in widgets:
-                for child in widgets[key].winfo_children():
-                    if isinstance(child, ctk.CTkCheckBox):
-                        val = getattr(f, attr)
-                        if val: child.select()
-                        else: child.deselect()
-                        if key == "soleit" and f.ftype == "Informativo": child.configure(state="disabled")
-                        elif key == "soleit": child.configure(state="normal")
+        for key, attr in (("obrig", "required"), ("soleit", "readonly")):
+            child = widgets[key]
+            if getattr(f, attr): child.select()
+            else: child.deselect()
+        widgets["soleit"].configure(state="disabled" if f.ftype == "Informativo" else "normal")
 
         # 3. Atualiza Nome e Observações (Sempre Entry, seguro atualizar)
-        for key, attr in [("obs", "note"), ("campo", "name")]:
-            if key in widgets:
-                for child in widgets[key].winfo_children():
-                    if isinstance(child, (ctk.CTkEntry, tk.Entry)):
-                        if self.focus_get() != child:
-                            current = child.get()
-                            val = getattr(f, attr) or ""
-                            if current != val:
-                                child.delete(0, "end")
-                                child.insert(0, val)
+        inputs = self._row_inputs.get(f.id, {})
+        for key, attr in (("obs", "note"), ("campo", "name")):
+            child = inputs.get(key)
+            if child is not None and not has_focus(child):
+                val = getattr(f, attr) or ""
+                if child.get() != val:
+                    child.delete(0, "end")
+                    child.insert(0, val)
 
         # 4. CRÍTICO: Recria a Célula de Opções ('opts') se o widget não bater com o tipo
         # Isso evita o lag de tentar adaptar widgets incompatíveis
-        if "opts" in widgets:
-            cell_frame = widgets["opts"]
-            children = cell_frame.winfo_children()
-            needs_rebuild = False
-            
-            if not children:
-                needs_rebuild = True
-            else:
-                widget = children[0]
-                is_button = isinstance(widget, ctk.CTkButton)
-                is_entry = isinstance(widget, (ctk.CTkEntry, tk.Entry))
-                
-                if f.ftype == "Objeto" and not is_button: needs_rebuild = True
-                elif f.ftype != "Objeto" and not is_entry: needs_rebuild = True
-
-            if needs_rebuild:
-                # Limpa célula
-                for child in children: child.destroy()
-                
-                # Recria widget correto
-                if f.ftype == "Objeto":
-                    label = f"Objeto do fluxo: {self.project.object_type or '(defina em Objetos > Tipo...)'}"
-                    btn = ctk.CTkButton(cell_frame, text=label + "  (Esquema…)", command=self.open_object_schema_editor)
-                    btn.pack(fill="both", expand=True)
-                    # Rebind menu context
-                    btn.bind("<Button-3>", lambda e: self._show_context_menu(e, f))
-                else:
-                    eopt = ctk.CTkEntry(cell_frame)
-                    eopt.insert(0, f.options or "")
-                    eopt.pack(fill="both", expand=True)
-                    eopt.bind("<FocusOut>", lambda _=None, w=eopt: (self._push_undo(), setattr(f, "options", w.get())))
-                    eopt.bind("<Button-3>", lambda e: self._show_context_menu(e, f))
+        wanted_kind = "button" if f.ftype == "Objeto" else "entry"
+        if widgets["opts_kind"] != wanted_kind:
+            cell_frame = widgets["opts_cell"]
+            # Limpa célula
+            for child in cell_frame.winfo_children(): child.destroy()
+
+            # Recria widget correto
+            if wanted_kind == "button":
+                label = f"Objeto do fluxo: {self.project.object_type or '(defina em Objetos > Tipo...)'}"
+                btn = ctk.CTkButton(cell_frame, text=label + "  (Esquema…)", command=self.open_object_schema_editor)
+                btn.pack(fill="both", expand=True)
+                self._tag_row_widgets(f, btn)
+                inputs.pop("opts", None)
+                widgets["opts"] = btn
             else:
-                # Se o widget já é do tipo certo, só atualiza o valor
-                if children and isinstance(children[0], (ctk.CTkEntry, tk.Entry)):
-                    w = children[0]
-                    if self.focus_get() != w:
-                        curr = w.get()
-                        val = f.options or ""
-                        if curr != val:
-                            w.delete(0, "end")
-                            w.insert(0, val)
+                eopt = ctk.CTkEntry(cell_frame)
+                eopt.insert(0, f.options or "")
+                eopt.pack(fill="both", expand=True)
+                self._register_row_input(f, "opts", eopt)
+                self._tag_row_widgets(f, eopt)
+                widgets["opts"] = eopt
+            widgets["opts_kind"] = wanted_kind
+        elif wanted_kind == "entry":
+            # Se o widget já é do tipo certo, só atualiza o valor
+            w = widgets["opts"]
+            if not has_focus(w):
+                val = f.options or ""
+                if w.get() != val:
+                    w.delete(0, "end")
+                    w.insert(0, val)
 
         # 5. Sincroniza o Menu de Tipo
-        if "tipo" in widgets:
-            for child in widgets["tipo"].winfo_children():
-                if isinstance(child, ctk.CTkOptionMenu):
-                    if child.get() != f.ftype: child.set(f.ftype)
+        om = widgets["tipo"]
+        if om.get() != f.ftype: om.set(f.ftype)
 
     def _append_row_widget(self, idx_row: int, f: Field, t: Task):
+        if self._row_build is not None:
+            # O campo novo já está em t.fields: construir as pendentes inclui a sua linha
+            self._flush_pending_rows()
+            self._apply_positions(self._col_positions(), rebuild_resizers=False)
+            return
         positions = self._col_positions()
         self._add_row_widget(idx_row, f, t, positions)
+        # Só a linha nova precisa de x/largura; as demais células já estão no lugar
+        self._place_cells(positions, self._row_cells[-1:])
         self._apply_positions(positions, rebuild_resizers=False)
 
-    def _add_row_widget(self, idx_row: int, f: Field, t: Task, positions: List[Tuple[str, int, int]]):
+    def _add_row_widget(self, idx_row: int, f: Field, t: Task, positions: ColPositions):
         bg = HILIGHT_ORIGIN_BG if (f.origin_task and f.origin_field) else "transparent"
         row = ctk.CTkFrame(self.rows_frame, fg_color=bg, height=self.row_h, corner_radius=0)
-        row.pack(fill="x", pady=0)
-        self._rows.append(row); self._row_cells[idx_row] = {}
+        row_cells: Dict[str, ctk.CTkFrame] = {}
+        self._rows.append(row); self._row_cells.append(row_cells)
         if f.id:
             self._field_row_map[f.id] = row
         
-        # Função de callback para o menu de contexto. "Congela" o campo atual.
-        show_menu_func = lambda e, field_obj=f: self._show_context_menu(e, field_obj)
-        row.bind("<Button-3>", show_menu_func)
+        # Menu de contexto: a tag "DesignerRow" (ver _tag_row_widgets) resolve o campo pelo widget clicado
+        tagged: List[tk.Misc] = [row]
+
+        pos_by_key = self._positions_by_key(positions)
 
         def cell(key: str) -> ctk.CTkFrame:
-            col_data = next((tup for tup in positions if tup[0] == key), None)
+            col_data = pos_by_key.get(key)
             if not col_data: return ctk.CTkFrame(row)
-            _, x, w = col_data
+            x, w = col_data
             cont = ctk.CTkFrame(row, fg_color="transparent", width=w, height=self.row_h, corner_radius=0)
-            cont.place(x=x, y=0); self._row_cells[idx_row][key] = cont
-            cont.bind("<Button-3>", show_menu_func)
+            cont.place(x=x, y=0); row_cells[key] = cont
+            tagged.append(cont)
             return cont
 
         # move
         cmove = cell("move")
         btn_frm = ctk.CTkFrame(cmove, fg_color="transparent")
         btn_frm.pack(expand=True)
-        btn_frm.bind("<Button-3>", show_menu_func)
         btn_up = ctk.CTkButton(btn_frm, text="▲", width=24, command=lambda fid=f.id: self._move_field(fid, -1))
         btn_up.pack(side="left", padx=(0,2))
-        btn_up.bind("<Button-3>", show_menu_func)
         btn_down = ctk.CTkButton(btn_frm, text="▼", width=24, command=lambda fid=f.id: self._move_field(fid, 1))
         btn_down.pack(side="left")
-        btn_down.bind("<Button-3>", show_menu_func)
 
         # sel
         cs = cell("sel")
-        v = tk.BooleanVar(value=(f.id in self.selected_field_ids))
-        chk = ctk.CTkCheckBox(cs, text="", variable=v, command=lambda fid=f.id, var=v: self._toggle_select(fid, var.get()))
+        # Checkboxes da grade sem tk.BooleanVar: o estado vem do Field/seleção e é lido do próprio widget
+        chk = ctk.CTkCheckBox(cs, text="", command=lambda: self._toggle_select(f.id, bool(chk.get())))
+        if f.id in self.selected_field_ids: chk.select()
         chk.pack(expand=True)
-        chk.bind("<Button-3>", show_menu_func)
 
         # nome
         ce = cell("campo")
         name_disabled = (f.name_lock_reason in ("objeto","origem")) or f.name_locked
         e = ctk.CTkEntry(ce); e.insert(0, f.name or "")
+        self._register_row_input(f, "campo", e)
         if name_disabled: e.configure(state="disabled")
         e.pack(fill="both", expand=True)
-        e.bind("<Button-3>", show_menu_func)
-        if not name_disabled:
-            e.bind("<FocusOut>", lambda _=None, w=e: self._on_field_name_changed(t.id, f, w.get()))
 
         # tipo
         ct = cell("tipo")
         om = ctk.CTkOptionMenu(ct, values=TYPE_VALUES, command=lambda *_: self._on_change_type(f, om.get()))
         base = _solid_color(); om.configure(fg_color=base, button_color=base, button_hover_color=base)
         om.set(f.ftype); om.pack(fill="both", expand=True)
-        om.bind("<Button-3>", show_menu_func)
-        # O ctk.CTkOptionMenu é complexo, então vinculamos seus filhos também por segurança
-        for child in om.winfo_children():
-            child.bind("<Button-3>", show_menu_func)
 
         # origem
         co = cell("origem")
@@ -2952,41 +3897,33 @@ class App(ctk.CTk):
         if f.origin_task and f.origin_field: origem_label = "🔗 " + origem_label
         btn_origin = ctk.CTkButton(co, text=origem_label, command=lambda: self.open_origin_picker(f))
         btn_origin.pack(fill="both", expand=True)
-        btn_origin.bind("<Button-3>", show_menu_func)
 
         # regras
         cr = cell("regras")
         summary = self._cond_summary(f)
         rule_frame = ctk.CTkFrame(cr, fg_color="transparent", corner_radius=6)
         rule_frame.pack(fill="both", expand=True)
-        col_w = next((c[2] for c in self.cols if c[0] == 'regras'), 300)
+        col_w = self._col_width_by_key.get('regras', 300)
         rule_label = ctk.CTkLabel(rule_frame, text=summary, anchor="w", justify="left", wraplength=col_w - 20)
         rule_label.pack(fill="both", expand=True, padx=10)
-
-        def on_enter(e): rule_frame.configure(fg_color=DARK_BG3)
-        def on_leave(e): rule_frame.configure(fg_color="transparent")
-        
-        rule_frame.bind("<Enter>", on_enter); rule_frame.bind("<Leave>", on_leave)
-        rule_frame.bind("<Button-1>", lambda e: self.open_cond_builder(f))
-        rule_label.bind("<Button-1>", lambda e: self.open_cond_builder(f))
-        rule_frame.bind("<Button-3>", show_menu_func)
-        rule_label.bind("<Button-3>", show_menu_func)
+        # Hover/clique tratados pela tag de classe "DesignerRule" (ver _on_rule_enter/_leave/_click)
+        for target in (*_ctk_event_targets(rule_frame), *_ctk_event_targets(rule_label)):
+            target._designer_rule_frame = rule_frame
+            target.bindtags((self._RULE_TAG,) + target.bindtags())
 
         # flags
         cobr = cell("obrig")
-        var_req = tk.BooleanVar(value=f.required)
-        chk_req = ctk.CTkCheckBox(cobr, text="", variable=var_req, command=lambda: (self._push_undo(), setattr(f, "required", var_req.get())))
+        chk_req = ctk.CTkCheckBox(cobr, text="", command=lambda: (self._push_undo(), setattr(f, "required", bool(chk_req.get()))))
+        if f.required: chk_req.select()
         chk_req.pack(expand=True)
-        chk_req.bind("<Button-3>", show_menu_func)
 
         csol = cell("soleit")
-        var_ro = tk.BooleanVar(value=f.readonly or (f.ftype == "Informativo"))
-        chk_ro = ctk.CTkCheckBox(csol, text="", variable=var_ro, command=lambda: self._set_readonly(f, var_ro.get()))
+        chk_ro = ctk.CTkCheckBox(csol, text="", command=lambda: self._set_readonly(f, bool(chk_ro.get())))
+        if f.readonly or f.ftype == "Informativo": chk_ro.select()
         if f.ftype == "Informativo":
             f.readonly = True
             chk_ro.configure(state="disabled")
         chk_ro.pack(expand=True)
-        chk_ro.bind("<Button-3>", show_menu_func)
 
         # opções
         copts = cell("opts")
@@ -2994,25 +3931,92 @@ class App(ctk.CTk):
             label = f"Objeto do fluxo: {self.project.object_type or '(defina em Objetos > Tipo...)'}"
             btn_opts = ctk.CTkButton(copts, text=label + "  (Esquema…)", command=self.open_object_schema_editor)
             btn_opts.pack(fill="both", expand=True)
-            btn_opts.bind("<Button-3>", show_menu_func)
+            opts_widget, opts_kind = btn_opts, "button"
         else:
             eopt = ctk.CTkEntry(copts); eopt.insert(0, f.options or ""); eopt.pack(fill="both", expand=True)
-            eopt.bind("<FocusOut>", lambda _=None, w=eopt: (self._push_undo(), setattr(f, "options", w.get())))
-            eopt.bind("<Button-3>", show_menu_func)
+            self._register_row_input(f, "opts", eopt)
+            opts_widget, opts_kind = eopt, "entry"
+        self._row_widgets[f.id] = {
+            "row": row, "tipo": om, "origem": btn_origin, "regras": rule_label,
+            "obrig": chk_req, "soleit": chk_ro,
+            "opts_cell": copts, "opts": opts_widget, "opts_kind": opts_kind,
+        }
 
         # observações
         cobs = cell("obs")
         eobs = ctk.CTkEntry(cobs); eobs.insert(0, f.note or ""); eobs.pack(fill="both", expand=True)
-        eobs.bind("<FocusOut>", lambda _=None, w=eobs: (self._push_undo(), setattr(f, "note", w.get())))
-        eobs.bind("<Button-3>", show_menu_func)
+        self._register_row_input(f, "obs", eobs)
 
         # delete
         cdel = cell("del")
         btn_del = ctk.CTkButton(cdel, text="x", command=lambda fid=f.id: self._delete_field(fid))
         btn_del.pack(expand=True)
-        btn_del.bind("<Button-3>", show_menu_func)
+
+        tagged += (btn_frm, btn_up, btn_down, chk, e, om, btn_origin, rule_frame, rule_label,
+                   chk_req, chk_ro, opts_widget, eobs, btn_del)
+        self._tag_row_widgets(f, *tagged)
+        # Empacotada só com as células prontas: o rows_frame recalcula a geometria uma vez por linha
+        row.pack(fill="x", pady=0)
 
 
+    _ROW_TAG = "DesignerRow"
+
+    def _tag_row_widgets(self, f: Field, *widgets: tk.Misc):
+        """Marca os widgets Tk de uma linha (e os internos do CTk que recebem os eventos) com o Field
+        e a tag de classe que abre o menu de contexto; um só bind_class no lugar de um lambda por widget."""
+        tag = self._ROW_TAG
+        for widget in widgets:
+            for w in (widget, *(getattr(widget, a, None) for a in ("_canvas", "_label", "_text_label", "_image_label", "_entry"))):
+                if w is not None:
+                    w._designer_field = f
+                    tags = w.bindtags()
+                    if tags[0] != tag: w.bindtags((tag,) + tags)
+
+    _RULE_TAG = "DesignerRule"
+
+    def _on_rule_enter(self, event):
+        frame = getattr(event.widget, "_designer_rule_frame", None)
+        if frame is not None: frame.configure(fg_color=DARK_BG3)
+
+    def _on_rule_leave(self, event):
+        frame = getattr(event.widget, "_designer_rule_frame", None)
+        if frame is not None: frame.configure(fg_color="transparent")
+
+    def _on_rule_click(self, event):
+        f = getattr(event.widget, "_designer_field", None)
+        if f is not None: self.open_cond_builder(f)
+
+    def _on_row_context(self, event):
+        f = getattr(event.widget, "_designer_field", None)
+        if f is not None:
+            self._show_context_menu(event, f)
+
+    _ENTRY_TAG = "DesignerRowEntry"
+
+    def _register_row_input(self, f: Field, key: str, entry: ctk.CTkEntry):
+        """Guarda a entrada da linha por campo e marca o Entry interno (o que recebe o foco) com o Field.
+
+        O <FocusOut> vem da tag de classe "DesignerRowEntry" (ver _on_row_entry_focus_out), não de um bind por entrada.
+        """
+        self._row_inputs.setdefault(f.id, {})[key] = entry
+        for w in (entry, getattr(entry, "_entry", None)):
+            if w is not None:
+                w._designer_field = f
+                w._designer_input = key
+        inner = getattr(entry, "_entry", entry)
+        inner.bindtags((self._ENTRY_TAG,) + inner.bindtags())
+
+    def _on_row_entry_focus_out(self, event):
+        w = event.widget
+        f = getattr(w, "_designer_field", None); key = getattr(w, "_designer_input", None)
+        if f is None or key is None: return
+        value = w.get()
+        if key == "campo":
+            if str(w.cget("state")) == "disabled": return  # nome bloqueado (objeto/origem)
+            self._on_field_name_changed(self._field_id_to_task_id.get(f.id, ""), f, value)
+        else:
+            self._schedule_commit(f, "options" if key == "opts" else "note", value)
+
     def _toggle_select(self, fid: str, val: bool):
         if val: self.selected_field_ids.add(fid)
         else: self.selected_field_ids.discard(fid)
@@ -3026,23 +4030,50 @@ class App(ctk.CTk):
         self._push_undo()
         t = self._get_task()
         to_del = set(self.selected_field_ids)
+        # Campos da tarefa atual que continuam na grade mas mudaram: só regras / também origem e bloqueio do nome
+        cond_changed: List[Field] = []; unlinked = False
         for task in self.project.tasks:
             for f in task.fields:
-                f.cond = [c for c in f.cond if c.src_field not in to_del]
+                # Só refaz a lista de condições de quem de fato aponta para um campo excluído
+                if f.cond and not to_del.isdisjoint(c.src_field for c in f.cond):
+                    f.cond = [c for c in f.cond if c.src_field not in to_del]
+                    if task is t: cond_changed.append(f)
                 if f.origin_field in to_del:
                     if f.name_lock_reason == "origem" and f.name_before_origin:
                         f.name = f.name_before_origin
+                        self._rename_field_in_cache(f)
                     f.origin_task = None; f.origin_field = None
                     f.name_lock_reason = "" if f.name_lock_reason == "origem" else f.name_lock_reason
                     f.name_locked = (f.name_lock_reason != "")
+                    if task is t: unlinked = True
+        self._flush_pending_rows()
+        rows_in_sync = len(self._rows) == len(t.fields)
+        # A seleção pode ter ids de outras tarefas: só os da tarefa atual são excluídos
+        deleted_ids = {f.id for f in t.fields if f.id in to_del}
         t.fields = [f for f in t.fields if f.id not in to_del]
         self.selected_field_ids.clear()
-        self._rebuild_metadata_cache()
-        self._refresh_rows()
+        self._remove_fields_from_cache(deleted_ids)
+        if rows_in_sync and not unlinked:
+            self._drop_rows(deleted_ids)
+            for f in cond_changed:
+                if f.id not in deleted_ids: self._update_single_row_widgets(f)
+        else:
+            self._refresh_rows()
         if self.sim_window and self.sim_window.winfo_exists():
             try: self.sim_window.on_model_changed()
             except Exception: pass
 
+    def _drop_rows(self, field_ids: Set[str]):
+        """Destrói as linhas desses campos e compacta _rows/_row_cells numa só passada."""
+        dead = {self._field_row_map.pop(fid) for fid in field_ids if fid in self._field_row_map}
+        if not dead: return
+        keep = [i for i, row in enumerate(self._rows) if row not in dead]
+        self._rows[:] = [self._rows[i] for i in keep]
+        self._row_cells[:] = [self._row_cells[i] for i in keep]
+        for fid in field_ids:
+            self._row_inputs.pop(fid, None); self._row_widgets.pop(fid, None)
+        for row in dead: row.destroy()
+
     # ===== Copiar/Colar Campos =====
     def _copy_selected_fields(self):
         self._commit_active_edits()
@@ -3064,7 +4095,7 @@ class App(ctk.CTk):
                     "name": field.name, "ftype": field.ftype,
                     "required": field.required, "readonly": field.readonly,
                     "info": field.info, "options": field.options, "note": field.note,
-                    "cond": [{"src_field": c.src_field, "op": c.op, "value": c.value} for c in field.cond],
+                    "cond": [_clone_cond(c) for c in field.cond],
                 }
                 fields_to_copy.append(field_data)
         
@@ -3120,7 +4151,8 @@ class App(ctk.CTk):
         elif choice == "origin":
             self._execute_paste_with_origin(target_task)
 
-        self._rebuild_metadata_cache()
+        # Os colados entram no fim da tarefa de destino; reindexá-la cobre os novos ids e nomes
+        self._add_task_to_cache(target_task)
         self.selected_field_ids.clear()
         self._refresh_rows()
 
@@ -3148,24 +4180,24 @@ class App(ctk.CTk):
 
         target_task.fields.extend([f for f, _ in new_fields_to_add])
 
-        all_fields_map = {f.id: f for t in self.project.tasks for f in t.fields}
-        missing_dependencies: List[str] = []
+        all_fields_map = self._field_by_id
+        missing_dependencies: Set[str] = set()
 
         for new_field, original_conds in new_fields_to_add:
-            for cond_data in original_conds:
-                src_id_orig = cond_data["src_field"]
+            for cond in original_conds:
+                src_id_orig = cond.src_field
                 new_src_id = original_to_new_id.get(src_id_orig)
                 if not new_src_id and src_id_orig in all_fields_map:
                     new_src_id = src_id_orig
                 if new_src_id:
-                    new_field.cond.append(Condition(src_field=new_src_id, op=cond_data["op"], value=cond_data["value"]))
+                    new_field.cond.append(_clone_cond(cond, new_src_id))
                 else:
-                    new_field.cond.append(Condition(src_field=src_id_orig, op=cond_data["op"], value=cond_data["value"]))
-                    missing_dependencies.append(src_id_orig)
+                    new_field.cond.append(_clone_cond(cond))
+                    missing_dependencies.add(src_id_orig)
 
         pasted_count = len(fields_to_paste)
         if missing_dependencies:
-            missing_list = "\n".join(f"- [id {fid}]" for fid in sorted(set(missing_dependencies)))
+            missing_list = "\n".join(f"- [id {fid}]" for fid in sorted(missing_dependencies))
             messagebox.showwarning(
                 "Colar",
                 f"{pasted_count} campo(s) colado(s) como cópia, porém algumas regras mantiveram referências a campos removidos.\n\n"
@@ -3182,7 +4214,7 @@ class App(ctk.CTk):
             messagebox.showerror("Colar com Origem", "Erro: A tarefa de origem não foi encontrada no clipboard.")
             return
 
-        all_fields_map = {f.id: f for t in self.project.tasks for f in t.fields}
+        all_fields_map = self._field_by_id
         
         for field_data in fields_to_paste:
             origin_field_id = field_data.get("id_origem")
@@ -3226,13 +4258,18 @@ class App(ctk.CTk):
         except Exception:
             pass
 
-        self.current_task_id = target_task.id
-        self._refresh_task_combo()
-        self._refresh_rows()
+        # Já na tarefa certa com as linhas montadas: só navega, sem reconstruir a grade
+        if self.current_task_id != target_task.id or not self._rows:
+            self.current_task_id = target_task.id
+            self._refresh_task_combo()
+            self._refresh_rows()
 
         if not field_id:
             return
 
+        # O campo pode estar entre as linhas ainda na fila de construção
+        if field_id not in self._field_row_map:
+            self._flush_pending_rows()
         row = self._field_row_map.get(field_id)
         if not row:
             return
@@ -3327,13 +4364,16 @@ class App(ctk.CTk):
         self._refresh_rows()
 
     def _on_field_name_changed(self, task_id: str, f: Field, new_name: str):
+        # <FocusOut> dispara mesmo sem edição: nada a propagar se o nome não mudou
+        if new_name == f.name: return
         self._push_undo()
         f.name = new_name
-        self._rebuild_metadata_cache() 
+        self._rename_field_in_cache(f)
         for t in self.project.tasks:
             for fld in t.fields:
                 if fld.origin_field == f.id and fld.name_lock_reason == "origem":
                     fld.name = new_name
+                    self._rename_field_in_cache(fld)
 
     def _origin_summary(self, f: Field) -> str:
         if f.origin_task and f.origin_field:
@@ -3422,9 +4462,9 @@ class App(ctk.CTk):
         if new_type == "Anexo" and prev != "Anexo":
             self._open_attachment_type_editor(f)
 
-        # Reconstrói cache se o nome mudou (ex: virou Objeto)
+        # Atualiza o nome no cache se ele mudou (ex: virou Objeto)
         if f.name_locked or prev == "Objeto":
-            self._rebuild_metadata_cache()
+            self._rename_field_in_cache(f)
 
         # CHAMA A NOVA ATUALIZAÇÃO OTIMIZADA
         self._update_single_row_widgets(f)
@@ -3448,47 +4488,46 @@ class App(ctk.CTk):
         t = self._get_task()
         f = Field(id=_uid())
         t.fields.append(f)
-        self._rebuild_metadata_cache()
+        self._add_field_to_cache(t, f)
         self._append_row_widget(len(t.fields)-1, f, t)
 
     def _delete_field(self, field_id: str):
         if not self.project.tasks:
             return
+        self._flush_pending_rows()
         self._push_undo()
         current_task = self._get_task()
         
         for task in self.project.tasks:
             for f in task.fields:
-                f.cond = [c for c in f.cond if c.src_field != field_id]
+                if f.cond and any(c.src_field == field_id for c in f.cond):
+                    f.cond = [c for c in f.cond if c.src_field != field_id]
                 if f.origin_field == field_id:
                     if f.name_lock_reason == "origem" and f.name_before_origin:
                         f.name = f.name_before_origin
+                        self._rename_field_in_cache(f)
                     f.origin_task = None
                     f.origin_field = None
                     f.name_lock_reason = "" if f.name_lock_reason == "origem" else f.name_lock_reason
                     f.name_locked = (f.name_lock_reason != "")
 
-        field_to_remove_idx = -1
-        for i, f in enumerate(current_task.fields):
-            if f.id == field_id:
-                field_to_remove_idx = i
-                break
-                
-        current_task.fields = [f for f in current_task.fields if f.id != field_id]
+        # Uma busca pela posição e remoção no lugar (em vez de procurar e depois refiltrar a lista inteira)
+        field_to_remove_idx = next((i for i, f in enumerate(current_task.fields) if f.id == field_id), -1)
+        if field_to_remove_idx != -1:
+            del current_task.fields[field_to_remove_idx]
 
         if field_to_remove_idx != -1 and field_to_remove_idx < len(self._rows):
             row_widget_to_remove = self._rows.pop(field_to_remove_idx)
             row_widget_to_remove.destroy()
-            self._row_cells.pop(field_to_remove_idx, None)
-            # Reindexa o dicionário de células
-            new_row_cells = {}
-            for i, (old_idx, value) in enumerate(self._row_cells.items()):
-                new_row_cells[i] = value
-            self._row_cells = new_row_cells
+            self._row_inputs.pop(field_id, None)
+            self._row_widgets.pop(field_id, None)
+            self._field_row_map.pop(field_id, None)
+            # As posições seguintes deslocam junto com _rows; não há índices a refazer
+            self._row_cells.pop(field_to_remove_idx)
         else:
             self._refresh_rows() # Fallback para garantir consistência
 
-        self._rebuild_metadata_cache()
+        self._remove_fields_from_cache((field_id,))
         
         if self.sim_window and self.sim_window.winfo_exists():
             try: self.sim_window.on_model_changed()
@@ -3512,7 +4551,7 @@ class App(ctk.CTk):
             "id_origem": field.id, "name": field.name, "ftype": field.ftype,
             "required": field.required, "readonly": field.readonly,
             "info": field.info, "options": field.options, "note": field.note,
-            "cond": [{"src_field": c.src_field, "op": c.op, "value": c.value} for c in field.cond],
+            "cond": [_clone_cond(c) for c in field.cond],
         }
         self._clipboard = {"source_task_id": current_task.id, "fields": [field_data]}
         self.btn_paste.configure(state="normal")
@@ -3540,33 +4579,54 @@ class App(ctk.CTk):
             origin_task=None, origin_field=None, # Duplicatas são independentes
             name_locked=field.name_locked, name_lock_reason=field.name_lock_reason,
             obj_type=field.obj_type,
-            cond=[Condition(**vars(c)) for c in field.cond] # Cópia profunda das condições
+            cond=[_clone_cond(c) for c in field.cond] # Cópia das condições
         )
+        # Linhas alinhadas com task.fields: insere só a linha da cópia em vez de refazer a grade
+        self._flush_pending_rows()
+        rows_in_sync = len(self._rows) == len(task.fields)
         task.fields.insert(original_index + 1, new_field)
-        self._rebuild_metadata_cache()
-        self._refresh_rows()
+        self._add_field_to_cache(task, new_field)
+        if rows_in_sync:
+            self._append_row_widget(len(task.fields) - 1, new_field, task)
+            self._relocate_row(len(task.fields) - 1, original_index + 1)
+        else:
+            self._refresh_rows()
 
     def _move_field_to_top(self, field: Field):
         """Move um campo para o início da lista na tarefa atual."""
+        self._flush_pending_rows() # A grade precisa refletir task.fields antes de mexer no modelo
         self._push_undo()
         task = self._get_task()
         if not task: return
         try:
-            task.fields.remove(field)
-            task.fields.insert(0, field)
-            self._refresh_rows()
-        except ValueError: pass # Campo não encontrado
+            idx = task.fields.index(field)
+        except ValueError: return # Campo não encontrado
+        task.fields.insert(0, task.fields.pop(idx))
+        self._relocate_row(idx, 0)
 
     def _move_field_to_end(self, field: Field):
         """Move um campo para o fim da lista na tarefa atual."""
+        self._flush_pending_rows() # A grade precisa refletir task.fields antes de mexer no modelo
         self._push_undo()
         task = self._get_task()
         if not task: return
         try:
-            task.fields.remove(field)
-            task.fields.append(field)
-            self._refresh_rows()
-        except ValueError: pass # Campo não encontrado
+            idx = task.fields.index(field)
+        except ValueError: return # Campo não encontrado
+        task.fields.append(task.fields.pop(idx))
+        self._relocate_row(idx, len(task.fields) - 1)
+
+    def _relocate_row(self, old_idx: int, new_idx: int):
+        """Leva a linha já construída de old_idx para new_idx (mesma ordem de task.fields) sem refazer a grade."""
+        self._flush_pending_rows()
+        rows = self._rows
+        if not (0 <= old_idx < len(rows) and 0 <= new_idx < len(rows)):
+            self._refresh_rows(); return
+        if old_idx == new_idx: return
+        row = rows.pop(old_idx); rows.insert(new_idx, row)
+        self._row_cells.insert(new_idx, self._row_cells.pop(old_idx))
+        if new_idx + 1 < len(rows): row.pack(before=rows[new_idx + 1])
+        else: row.pack(after=rows[new_idx - 1])
 
     def _open_attachment_type_editor(self, field: Field):
         """Abre um diálogo para editar a tag [Tipo de Doc.:] na nota de um campo."""
@@ -3964,7 +5024,7 @@ class App(ctk.CTk):
                 for f in t.fields:
                     if f.ftype == "Objeto":
                         f.obj_type = name; f.name = name; f.name_lock_reason="objeto"; f.name_locked=True
-            self._rebuild_metadata_cache()
+                        self._rename_field_in_cache(f)
             self._refresh_flow_label(); self._refresh_rows(); ok_pressed["v"] = True; win.destroy()
         ctk.CTkButton(win, text="OK", width=120, command=ok).pack(pady=12)
         self.wait_window(win); return ok_pressed["v"]
@@ -4109,7 +5169,6 @@ class App(ctk.CTk):
             for i, ofd in enumerate(new_schema): ofd.order = i
             self._push_undo()
             self.project.object_schema = new_schema
-            self._rebuild_metadata_cache()
             messagebox.showinfo("Importar", "Esquema do Objeto importado de XLSX.")
         except Exception as e: messagebox.showerror("Importar XLSX", f"Falha ao importar.\n\n{e}")
 
@@ -4203,7 +5262,7 @@ class App(ctk.CTk):
     def save_project(self):
         path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Projeto","*.json")])
         if not path: return
-        with open(path, "w", encoding="utf-8") as f: json.dump(self.project.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(path, "w", encoding="utf-8") as f: f.write(_json_dumps(self.project.to_dict()))
         messagebox.showinfo("Salvar", "Projeto salvo.")
 
     def open_project(self):
@@ -4217,7 +5276,7 @@ class App(ctk.CTk):
             return
 
         try:
-            data = json.loads(raw_data)
+            data = _json_loads(raw_data)
         except json.JSONDecodeError as exc:
             messagebox.showerror("Abrir projeto", f"O arquivo não é um JSON válido.\n\n{exc}")
             return
@@ -4337,9 +5396,7 @@ class App(ctk.CTk):
                                 base_field = next((fld for fld in t.fields if fld.name == base_name), None)
                                 if base_field: f.cond.append(Condition(src_field=base_field.id, op="==", value=value))
             proj.tasks = list(tasks_by_name.values())
-            
-            # Rebuild cache for origin mapping
-            temp_app = App(); temp_app.project = proj; temp_app._rebuild_metadata_cache()
+
             
             for f, tname, fname in pending_origins:
                 src_t = next((tx for tx in proj.tasks if tx.name == tname), None)
@@ -4359,7 +5416,7 @@ class App(ctk.CTk):
             else:
                 name = self._prompt_text("Salvar como template", "Nome do template:", proj.flow_name or "Fluxo importado")
                 if name is not None:
-                    exists = next((x for x in self.store.list_all() if x.get("name","") == name), None)
+                    exists = self.store.get_by_name(name)
                     if exists:
                         rep = messagebox.askyesno("Templates", f"Já existe '{name}'. Substituir?\n\nSim = Substituir | Não = Criar cópia")
                         if rep: self.store.save_template(name, proj, replace=True)
@@ -4475,15 +5532,15 @@ class App(ctk.CTk):
             path = filedialog.asksaveasfilename(defaultextension=".template.json", filetypes=[("Template JSON","*.template.json")], initialfile=f"{t.get('name','template')}.template.json")
             if not path: return
             data = {"name": t.get("name",""), "project": t.get("project", {}), "exported_at": _now_iso(), "version": APP_VERSION}
-            with open(path, "w", encoding="utf-8") as f: json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(path, "w", encoding="utf-8") as f: f.write(_json_dumps(data))
             messagebox.showinfo("Templates", "Template exportado.", parent=win)
         def import_template():
             path = filedialog.askopenfilename(filetypes=[("Template JSON","*.template.json"), ("JSON","*.json")])
             if not path: return
             try:
-                with open(path, "r", encoding="utf-8") as f: data = json.load(f)
+                with open(path, "r", encoding="utf-8") as f: data = _json_loads(f.read())
                 name = (data.get("name") or "Template importado").strip(); project_dict = data.get("project", {})
-                items = self.store.list_all(); exists = next((x for x in items if x.get("name","") == name), None)
+                exists = self.store.get_by_name(name)
                 if exists:
                     res = messagebox.askyesno("Templates", f"Já existe '{name}'. Substituir?\n\nSim = Substituir | Não = Criar cópia", parent=win)
                     if res: self.store.save_template(name, ProjectModel.from_dict(project_dict), replace=True)
@@ -4503,7 +5560,7 @@ class App(ctk.CTk):
     def save_flow_as_template(self):
         name = self._prompt_text("Salvar como template", "Nome do template:", self.project.flow_name or "Fluxo")
         if name is not None:
-            exists = next((x for x in self.store.list_all() if x.get("name","") == name), None)
+            exists = self.store.get_by_name(name)
             if exists:
                 rep = messagebox.askyesno("Templates", f"Já existe '{name}'. Substituir?\n\nSim = Substituir | Não = Criar cópia")
                 if rep: self.store.save_template(name, self.project, replace=True)
@@ -4632,7 +5689,7 @@ class App(ctk.CTk):
             f.readonly = var_force_ro.get()
             f.required = var_force_req.get()
 
-            self._rebuild_metadata_cache()
+            self._rename_field_in_cache(f)
             win.destroy(); self._update_single_row_widgets(f)
             
         def clear():
@@ -4641,7 +5698,7 @@ class App(ctk.CTk):
             f.origin_task=None; f.origin_field=None
             f.name_lock_reason = "" if f.name_lock_reason == "origem" else f.name_lock_reason
             f.name_locked = (f.name_lock_reason != ""); 
-            self._rebuild_metadata_cache()
+            self._rename_field_in_cache(f)
             win.destroy(); self._update_single_row_widgets(f)
 
         ctk.CTkButton(btns, text="Limpar", width=110, command=clear).pack(side="left", padx=(0, 8))